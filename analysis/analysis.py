@@ -1,65 +1,152 @@
-import pandas as pd
+import io
+import mmap
+import multiprocessing
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Non-interactive backend; figures are only saved to disk
 import matplotlib.pyplot as plt
-from io import StringIO
+import os
 import sys
-import warnings
 
-def load_xvg_data(filename, x_col="X-Axis", y_col="Y-Axis"):
+# Drop sub-pixel line vertices when rendering long MD time series
+plt.rcParams['path.simplify'] = True
+plt.rcParams['path.simplify_threshold'] = 1.0
+plt.rcParams['agg.path.chunksize'] = 10000
+
+def find_data_start(buf):
+    """
+    Returns the byte offset just past the '@'/'#' header block at the top of
+    an .xvg buffer, or None if the buffer holds no data lines at all.
+    """
+    pos = 0
+    size = len(buf)
+    while pos < size:
+        end = buf.find(b'\n', pos)
+        if end == -1:
+            end = size
+        line = buf[pos:end].strip()
+        if line and not line.startswith((b'@', b'#', b'&')):
+            return pos
+        pos = end + 1
+    return None
+
+def parse_xvg_block(data, ncols=2):
+    """
+    Parses the numeric block of an .xvg file into an (N, ncols) float64 array
+    with NumPy's C number scanner. Returns None if the block is not a clean
+    ncols-wide single data set, leaving those files to np.loadtxt.
+    """
+    end = data.find(b'\n&')
+    if end != -1:
+        if find_data_start(data[end + 1:]) is not None:
+            return None
+        data = data[:end]
+    first_line = data[:data.find(b'\n')] if b'\n' in data else data
+    if len(first_line.split()) != ncols:
+        return None
+    try:
+        values = np.fromstring(data, sep=' ')
+    except ValueError:
+        return None
+    if values.size % ncols:
+        return None
+    return values.reshape(-1, ncols)
+
+def load_xvg_data(filename):
     """
     Loads data from a GROMACS .xvg file.
     
     Skips lines starting with '@', '#', or '&'.
-    Returns a pandas DataFrame with specified column names.
-    Returns an empty DataFrame if the file is not found or is empty.
+    Returns a float64 array of shape (N, 2) holding the x and y columns.
+    Returns an empty (0, 2) array if the file is not found or is empty.
+    Parsed data is cached next to the source as '<file>.npy' and reused
+    while it is newer than the .xvg.
     """
-    filtered_lines = []
+    empty = np.empty((0, 2), dtype=np.float64)
+    cache_file = filename + '.npy'
+    try:
+        if os.path.getmtime(cache_file) >= os.path.getmtime(filename):
+            return np.load(cache_file, mmap_mode='r')
+    except (OSError, ValueError):
+        pass
+
     try:
-        with open(filename, 'r') as f:
-            for line in f:
-                # Skip header/comment/special lines
-                if not line.strip().startswith(('@', '#', '&')):
-                    filtered_lines.append(line)
+        with open(filename, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            data_start = find_data_start(buf)
+            data = buf[data_start:] if data_start is not None else b''
     except FileNotFoundError:
         print(f"Warning: File not found: {filename}. Skipping this plot.", file=sys.stderr)
-        return pd.DataFrame(columns=[x_col, y_col])
+        return empty
+    except ValueError:
+        # mmap refuses zero-length files
+        data = b''
     except Exception as e:
         print(f"Error reading {filename}: {e}", file=sys.stderr)
-        return pd.DataFrame(columns=[x_col, y_col])
+        return empty
 
-    if not filtered_lines:
+    if not data:
         print(f"Warning: No data found in {filename} after filtering.", file=sys.stderr)
-        return pd.DataFrame(columns=[x_col, y_col])
+        return empty
+
+    # Plain two-column blocks go straight to NumPy's number scanner
+    values = parse_xvg_block(data)
 
     try:
-        # Use StringIO to read the list of strings as if it were a file
-        data_io = StringIO("".join(filtered_lines))
-        
-        # Suppress the FutureWarning from pandas
-        with warnings.catch_warnings():
-            warnings.simplefilter(action='ignore', category=FutureWarning)
-            df = pd.read_csv(
-                data_io,
-                sep='\s+',  # Use sep='\s+' instead of delim_whitespace=True
-                header=None,
-                names=[x_col, y_col], # Use the provided column names
-                dtype={x_col: float, y_col: float},
-                engine='python' 
-            )
-        return df
+        # Otherwise the block may hold several data sets, each '&' followed
+        # by its own '@target'/'@type' lines, so every '@', '#' and '&' line
+        # is treated as a comment, not just the header at the top
+        if values is None:
+            values = np.loadtxt(io.BytesIO(data), comments=['@', '#', '&'],
+                                usecols=(0, 1), ndmin=2)
     except Exception as e:
         print(f"Error parsing data from {filename}: {e}", file=sys.stderr)
-        return pd.DataFrame(columns=[x_col, y_col])
+        return empty
+
+    try:
+        np.save(cache_file, values)
+    except OSError:
+        pass
+    return values
 
-def plot_analysis_on_ax(ax, data_file, title, x_label, y_label, plot_color, legend_label):
+def lttb_downsample(x, y, n_out=2000):
     """
-    Plots a single analysis (like Rg, RMSF, or SASA) on a given matplotlib axes.
+    Downsamples a line series to n_out points with Largest-Triangle-Three-Buckets.
+    Keeps the first and last points, and from each bucket in between the point
+    spanning the largest triangle with its neighbours, so peaks survive.
     """
-    # Load the data using our flexible function
-    df = load_xvg_data(data_file, x_col=x_label, y_col=y_label)
+    n = len(x)
+    if n_out < 3 or n <= n_out:
+        return x, y
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=np.intp)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket (the last point closes the final one)
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a])
+                      - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        keep[i + 1] = a
+    return x[keep], y[keep]
 
-    # Plot data if DataFrame is not empty
-    if not df.empty:
-        ax.plot(df[x_label], df[y_label], 
+def plot_analysis_on_ax(ax, data, title, x_label, y_label, plot_color, legend_label):
+    """
+    Plots a single analysis (like Rg, RMSF, or SASA) on a given matplotlib axes.
+    Expects the (N, 2) array returned by load_xvg_data.
+    """
+    # Plot data if the array is not empty
+    if data.size:
+        x, y = data[:, 0], data[:, 1]
+        # Long trajectories hold far more frames than the axis has pixels
+        if len(x) > 4000:
+            x, y = lttb_downsample(x, y, 2000)
+        ax.plot(x, y, 
                 label=legend_label, color=plot_color, linewidth=1.5)
     
     # Set subplot titles and labels
@@ -69,8 +156,8 @@ def plot_analysis_on_ax(ax, data_file, title, x_label, y_label, plot_color, lege
     
     # Add legend and grid
     # --- THIS IS THE MODIFIED LINE ---
-    # Only show legend if the dataframe is not empty AND legend_label is not empty
-    if not df.empty and legend_label:
+    # Only show legend if there is data AND legend_label is not empty
+    if data.size and legend_label:
         ax.legend()
     ax.grid(True, linestyle='--', alpha=0.6)
 
@@ -90,47 +177,35 @@ if __name__ == "__main__":
     OUTPUT_FILENAME = 'rg_subplot_comparison.png'
 
     # --- 2. DEFINE YOUR FILES AND SUBPLOTS ---
+    # (data file, subplot title, line color) for each panel, in 2x2 grid order
+    PANELS = [
+        ('control_radius_of_gyration.xvg', 'A) Control Complex', '#1e3a8a'),  # Dark Blue
+        ('hedragenin_radius_of_gyration.xvg', 'B) Hedragenin Analogue', '#15803d'),  # Dark Green
+        ('lupeol_radius_of_gyration.xvg', 'C) Lupeol Analogue', '#7c3aed'),  # Bright Purple
+        ('maslinic_acid_radius_of_gyration.xvg', 'D) Maslinic Acid Analogue', '#92400e'),  # Dark Brown
+    ]
+
+    # Parse all files in parallel worker processes; plotting stays in the
+    # main process because matplotlib is not safe to drive concurrently
+    with multiprocessing.Pool(len(PANELS)) as pool:
+        arrays = pool.map(load_xvg_data, [data_file for data_file, _, _ in PANELS])
+
     # Create a 2x2 subplot grid
     fig, axes = plt.subplots(nrows=2, ncols=2, figsize=(16, 12))
 
-    # --- Plot 1 (Top-Left) ---
-    plot_analysis_on_ax(axes[0, 0], 
-                        data_file='control_radius_of_gyration.xvg', 
-                        title='A) Control Complex',
-                        x_label=X_AXIS_LABEL, y_label=Y_AXIS_LABEL,
-                        plot_color='#1e3a8a',  # Dark Blue
-                        legend_label=LEGEND_LABEL)
-
-    # --- Plot 2 (Top-Right) ---
-    plot_analysis_on_ax(axes[0, 1], 
-                        data_file='hedragenin_radius_of_gyration.xvg', 
-                        title='B) Hedragenin Analogue',
-                        x_label=X_AXIS_LABEL, y_label=Y_AXIS_LABEL,
-                        plot_color='#15803d',  # Dark Green
-                        legend_label=LEGEND_LABEL)
-
-    # --- Plot 3 (Bottom-Left) ---
-    plot_analysis_on_ax(axes[1, 0], 
-                        data_file='lupeol_radius_of_gyration.xvg', 
-                        title='C) Lupeol Analogue',
-                        x_label=X_AXIS_LABEL, y_label=Y_AXIS_LABEL,
-                        plot_color='#7c3aed',  # Bright Purple
-                        legend_label=LEGEND_LABEL)
-
-    # --- Plot 4 (Bottom-Right) ---
-    plot_analysis_on_ax(axes[1, 1], 
-                        data_file='maslinic_acid_radius_of_gyration.xvg', 
-                        title='D) Maslinic Acid Analogue',
-                        x_label=X_AXIS_LABEL, y_label=Y_AXIS_LABEL,
-                        plot_color='#92400e',  # Dark Brown
-                        legend_label=LEGEND_LABEL)
+    for ax, data, (_, title, plot_color) in zip(axes.flat, arrays, PANELS):
+        plot_analysis_on_ax(ax, data,
+                            title=title,
+                            x_label=X_AXIS_LABEL, y_label=Y_AXIS_LABEL,
+                            plot_color=plot_color,
+                            legend_label=LEGEND_LABEL)
 
     # --- 3. SAVE THE FIGURE ---
     fig.suptitle(MAIN_TITLE, fontsize=18, fontweight='bold')
     fig.tight_layout(rect=[0, 0.03, 1, 0.96]) 
-    plt.savefig(OUTPUT_FILENAME, dpi=300)
-# Save the final figure as EPS
+    fig.savefig(OUTPUT_FILENAME, dpi=300)
+    # Save the final figure as EPS
     output_filename = 'rg_subplot_comparison.eps'
-    plt.savefig(output_filename, format='eps')
+    fig.savefig(output_filename, format='eps')
     print(f"Successfully generated subplot comparison plot: {OUTPUT_FILENAME}")
 
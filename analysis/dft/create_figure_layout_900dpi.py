@@ -3,12 +3,50 @@
 Create publication-quality figure layouts from molecular visualization images
 Matches the reference layout style with ESP surfaces and HOMO-LUMO orbitals
 High-resolution 900 DPI output with transparent backgrounds
+
+Images are decoded and LANCZOS-resized on a thread pool. Resampling is the
+bulk of the run time, so installing Pillow-SIMD (pip install pillow-simd,
+a drop-in replacement for Pillow) speeds it up further.
 """
 
 from PIL import Image, ImageDraw, ImageFont
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import numpy as np
 import os
 import sys
 
+FONT_BOLD = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+FONT_REGULAR = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+
+@functools.lru_cache(maxsize=None)
+def get_font(path, size):
+    """Load a TrueType font once per (path, size), falling back to PIL's default"""
+    try:
+        return ImageFont.truetype(path, size)
+    except OSError:
+        return ImageFont.load_default()
+
+@functools.lru_cache(maxsize=None)
+def text_width(text, font):
+    """Width of a single line of text in the given font (cached)"""
+    bbox = font.getbbox(text)
+    return bbox[2] - bbox[0]
+
+def load_and_resize(path, height, width=None):
+    """
+    Load an image as RGBA and LANCZOS-resize it to the given height
+    (width follows the aspect ratio unless given)
+    """
+    img = Image.open(path)
+    img.load()
+    if img.mode != 'RGBA':
+        img = img.convert('RGBA')
+    if width is None:
+        width = int(height * (img.width / img.height))
+    return img.resize((width, height), Image.Resampling.LANCZOS)
+
+
 def create_esp_figure(molecules, output_file='Figure_ESP_Surfaces_900dpi.png'):
     """
     Create ESP surface comparison figure (similar to Fig. 11 reference)
@@ -17,38 +55,31 @@ def create_esp_figure(molecules, output_file='Figure_ESP_Surfaces_900dpi.png'):
     print(f"Creating ESP surface comparison figure...")
     
     # Load images
-    images = []
+    esp_files = []
     labels = []
     
     for mol_name, label in molecules:
         esp_file = f"{mol_name}_ESP_Surface_dpi900.png"
         
         if os.path.exists(esp_file):
-            img = Image.open(esp_file)
-            # Convert to RGBA if not already
-            if img.mode != 'RGBA':
-                img = img.convert('RGBA')
-            images.append(img)
+            esp_files.append(esp_file)
             labels.append(label)
             print(f"  ✓ Loaded {esp_file}")
         else:
             print(f"  ✗ Missing {esp_file}")
     
-    if not images:
+    if not esp_files:
         print("No ESP images found!")
         return
     
     # Calculate dimensions (scaled for 900 DPI)
-    n_images = len(images)
+    n_images = len(esp_files)
     
-    # Resize all images to same height (larger for 900 DPI)
+    # Decode and resize all images to same height in parallel (larger for 900 DPI)
     target_height = 2400  # 3x larger for 900 DPI
-    resized_images = []
-    for img in images:
-        aspect = img.width / img.height
-        new_width = int(target_height * aspect)
-        resized = img.resize((new_width, target_height), Image.Resampling.LANCZOS)
-        resized_images.append(resized)
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+        resized_images = list(pool.map(load_and_resize, esp_files,
+                                       [target_height] * n_images))
     
     # Calculate canvas size (scaled margins)
     total_width = sum(img.width for img in resized_images)
@@ -64,21 +95,15 @@ def create_esp_figure(molecules, output_file='Figure_ESP_Surfaces_900dpi.png'):
     draw = ImageDraw.Draw(canvas)
     
     # Try to load fonts (larger sizes for 900 DPI)
-    try:
-        font_label = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 108)  # 3x larger
-        font_caption = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 84)  # Larger and bold for caption
-    except:
-        font_label = ImageFont.load_default()
-        font_caption = ImageFont.load_default()
+    font_label = get_font(FONT_BOLD, 108)  # 3x larger
+    font_caption = get_font(FONT_BOLD, 84)  # Larger and bold for caption
     
     # Place images with labels
     x_offset = margin
     for i, (img, label) in enumerate(zip(resized_images, labels)):
         # Draw label (A., B., C., etc.)
         label_text = f"{chr(65+i)}. {label}"
-        bbox = draw.textbbox((0, 0), label_text, font=font_label)
-        text_width = bbox[2] - bbox[0]
-        text_x = x_offset + (img.width - text_width) // 2
+        text_x = x_offset + (img.width - text_width(label_text, font_label)) // 2
         draw.text((text_x, margin), label_text, fill='black', font=font_label)
         
         # Paste image
@@ -88,8 +113,7 @@ def create_esp_figure(molecules, output_file='Figure_ESP_Surfaces_900dpi.png'):
     
     # Add caption with larger font
     caption = "Molecular electrostatic potential (MEP) surface analysis"
-    bbox = draw.textbbox((0, 0), caption, font=font_caption)
-    caption_width = bbox[2] - bbox[0]
+    caption_width = text_width(caption, font_caption)
     caption_x = (canvas_width - caption_width) // 2
     caption_y = canvas_height - colorbar_height - margin
     draw.text((caption_x, caption_y), caption, fill='black', font=font_caption)
@@ -99,37 +123,44 @@ def create_esp_figure(molecules, output_file='Figure_ESP_Surfaces_900dpi.png'):
     colorbar_width = 1800  # 3x larger
     colorbar_x = (canvas_width - colorbar_width) // 2
     
-    # Draw gradient colorbar (red to white to blue)
-    for i in range(colorbar_width):
-        ratio = i / colorbar_width
-        if ratio < 0.5:
-            # Red to white
-            r = 255
-            g = int(255 * (ratio * 2))
-            b = int(255 * (ratio * 2))
-        else:
-            # White to blue
-            r = int(255 * (2 - ratio * 2))
-            g = int(255 * (2 - ratio * 2))
-            b = 255
-        
-        draw.line([(colorbar_x + i, colorbar_y), 
-                   (colorbar_x + i, colorbar_y + 90)], 
-                  fill=(r, g, b))
-    
-    # Draw colorbar border
-    draw.rectangle([colorbar_x, colorbar_y, 
-                    colorbar_x + colorbar_width, colorbar_y + 90], 
-                   outline='black', width=6)
-    
-    # Add colorbar labels (larger font)
-    try:
-        font_colorbar = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 72)
-    except:
-        font_colorbar = font_caption
-    
-    draw.text((colorbar_x - 240, colorbar_y + 15), "-0.030", fill='black', font=font_colorbar)
-    draw.text((colorbar_x + colorbar_width + 30, colorbar_y + 15), "0.030", fill='black', font=font_colorbar)
+    # Compose the colorbar, its border and tick labels on one off-screen
+    # layer, then composite it onto the canvas in a single operation
+    layer_x = colorbar_x - 300
+    layer = Image.new('RGBA', (colorbar_width + 600, 150), (255, 255, 255, 0))
+    layer_draw = ImageDraw.Draw(layer)
+    bar_x = colorbar_x - layer_x
+    
+    # Gradient colorbar (red to white to blue)
+    ratio = np.arange(colorbar_width) / colorbar_width
+    fade = np.where(ratio < 0.5, 255 * (ratio * 2), 255 * (2 - ratio * 2)).astype(np.uint8)
+    full = np.full(colorbar_width, 255, dtype=np.uint8)
+    gradient = np.stack([np.where(ratio < 0.5, full, fade),   # Red to white
+                         fade,
+                         np.where(ratio < 0.5, fade, full)],  # White to blue
+                        axis=-1)
+    colorbar = np.broadcast_to(gradient, (91, colorbar_width, 3))
+    layer.paste(Image.fromarray(np.ascontiguousarray(colorbar), 'RGB'), (bar_x, 0))
+    
+    # Colorbar border
+    layer_draw.rectangle([bar_x, 0, bar_x + colorbar_width, 90], 
+                         outline='black', width=6)
+    
+    # Colorbar labels (larger font)
+    font_colorbar = get_font(FONT_REGULAR, 72)
+    
+    layer_draw.text((bar_x - 240, 15), "-0.030", fill='black', font=font_colorbar)
+    layer_draw.text((bar_x + colorbar_width + 30, 15), "0.030", fill='black', font=font_colorbar)
+    
+    # alpha_composite rejects a negative destination, so on a canvas
+    # narrower than the layer only its on-canvas part is composited (the
+    # same clipping the canvas applied when drawing on it directly)
+    left, top = max(layer_x, 0), max(colorbar_y, 0)
+    right = min(layer_x + layer.width, canvas_width)
+    bottom = min(colorbar_y + layer.height, canvas_height)
+    if right > left and bottom > top:
+        canvas.alpha_composite(layer, (left, top),
+                               (left - layer_x, top - colorbar_y,
+                                right - layer_x, bottom - colorbar_y))
     
     # Save with transparency at 900 DPI
     canvas.save(output_file, 'PNG', dpi=(900, 900))
@@ -157,31 +188,25 @@ def create_homo_lumo_figure(molecules, output_file='Figure_HOMO_LUMO_900dpi.png'
         homo_file = f"{mol_name}_HOMO_Orbital_dpi900.png"
         lumo_file = f"{mol_name}_LUMO_Orbital_dpi900.png"
         
-        homo_img = None
-        lumo_img = None
+        homo_found = os.path.exists(homo_file)
+        lumo_found = os.path.exists(lumo_file)
         
-        if os.path.exists(homo_file):
-            homo_img = Image.open(homo_file)
-            if homo_img.mode != 'RGBA':
-                homo_img = homo_img.convert('RGBA')
+        if homo_found:
             print(f"  ✓ Loaded {homo_file}")
         else:
             print(f"  ✗ Missing {homo_file}")
             
-        if os.path.exists(lumo_file):
-            lumo_img = Image.open(lumo_file)
-            if lumo_img.mode != 'RGBA':
-                lumo_img = lumo_img.convert('RGBA')
+        if lumo_found:
             print(f"  ✓ Loaded {lumo_file}")
         else:
             print(f"  ✗ Missing {lumo_file}")
         
-        if homo_img and lumo_img:
+        if homo_found and lumo_found:
             data.append({
                 'name': mol_name,
                 'label': label,
-                'homo': homo_img,
-                'lumo': lumo_img
+                'homo': homo_file,
+                'lumo': lumo_file
             })
     
     if not data:
@@ -190,11 +215,14 @@ def create_homo_lumo_figure(molecules, output_file='Figure_HOMO_LUMO_900dpi.png'
     
     n_molecules = len(data)
     
-    # Resize images (scaled for 900 DPI)
+    # Decode and resize all orbital images in parallel (scaled for 900 DPI)
     target_size = 1800  # 3x larger
-    for item in data:
-        item['homo'] = item['homo'].resize((target_size, target_size), Image.Resampling.LANCZOS)
-        item['lumo'] = item['lumo'].resize((target_size, target_size), Image.Resampling.LANCZOS)
+    paths = [item[key] for item in data for key in ('homo', 'lumo')]
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+        resized = list(pool.map(load_and_resize, paths, [target_size] * len(paths),
+                                [target_size] * len(paths)))
+    for i, item in enumerate(data):
+        item['homo'], item['lumo'] = resized[2 * i], resized[2 * i + 1]
     
     # Calculate canvas dimensions (scaled)
     margin = 120  # 3x larger
@@ -210,16 +238,10 @@ def create_homo_lumo_figure(molecules, output_file='Figure_HOMO_LUMO_900dpi.png'
     draw = ImageDraw.Draw(canvas)
     
     # Fonts (scaled for 900 DPI)
-    try:
-        font_header = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 96)  # 3x larger
-        font_label = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 84)  # 3x larger
-        font_value = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 72)  # 3x larger
-        font_caption = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 78)  # Larger and bold
-    except:
-        font_header = ImageFont.load_default()
-        font_label = ImageFont.load_default()
-        font_value = ImageFont.load_default()
-        font_caption = ImageFont.load_default()
+    font_header = get_font(FONT_BOLD, 96)  # 3x larger
+    font_label = get_font(FONT_BOLD, 84)  # 3x larger
+    font_value = get_font(FONT_REGULAR, 72)  # 3x larger
+    font_caption = get_font(FONT_BOLD, 78)  # Larger and bold
     
     # Draw row labels
     lumo_y = header_height + margin
@@ -236,9 +258,7 @@ def create_homo_lumo_figure(molecules, output_file='Figure_HOMO_LUMO_900dpi.png'
     for i, item in enumerate(data):
         # Column header
         header_text = f"{chr(65+i)}. {item['label']}"
-        bbox = draw.textbbox((0, 0), header_text, font=font_header)
-        text_width = bbox[2] - bbox[0]
-        text_x = x_offset + (target_size - text_width) // 2
+        text_x = x_offset + (target_size - text_width(header_text, font_header)) // 2
         draw.text((text_x, 60), header_text, fill='black', font=font_header)
         
         # LUMO image
@@ -298,8 +318,7 @@ def create_homo_lumo_figure(molecules, output_file='Figure_HOMO_LUMO_900dpi.png'
     for word in words:
         current_line.append(word)
         test_line = ' '.join(current_line)
-        bbox = draw.textbbox((0, 0), test_line, font=font_caption)
-        if bbox[2] - bbox[0] > canvas_width - 300:
+        if text_width(test_line, font_caption) > canvas_width - 300:
             current_line.pop()
             lines.append(' '.join(current_line))
             current_line = [word]
@@ -310,9 +329,7 @@ def create_homo_lumo_figure(molecules, output_file='Figure_HOMO_LUMO_900dpi.png'
     # Draw caption lines
     caption_y = canvas_height - 180
     for line in lines:
-        bbox = draw.textbbox((0, 0), line, font=font_caption)
-        text_width = bbox[2] - bbox[0]
-        text_x = (canvas_width - text_width) // 2
+        text_x = (canvas_width - text_width(line, font_caption)) // 2
         draw.text((text_x, caption_y), line, fill='black', font=font_caption)
         caption_y += 90
     
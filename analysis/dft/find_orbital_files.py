@@ -4,38 +4,49 @@ Diagnostic script to find all molecular orbital and ESP files
 """
 
 import os
-import glob
 
 print("=" * 70)
 print("MOLECULAR VISUALIZATION FILE FINDER")
 print("=" * 70)
 
+# List the directory once; every lookup below uses this name -> DirEntry map
+# instead of re-reading the directory or stat'ing each candidate name.
+# is_file() comes from the listing itself, and entry.stat() is only called
+# (once, it is cached on the entry) for files whose size gets printed
+entries = {entry.name: entry
+           for entry in os.scandir('.') if entry.is_file()}
+
+def find_png(tag):
+    """Non-hidden .png files whose name contains tag (like glob '*tag*.png')"""
+    return [f for f in entries
+            if tag in f and f.endswith('.png') and not f.startswith('.')]
+
 # Find all ESP files
 print("\n📊 ESP SURFACE FILES:")
-esp_files = glob.glob("*ESP*.png")
+esp_files = find_png("ESP")
 if esp_files:
     for f in sorted(esp_files):
-        size = os.path.getsize(f) / 1024
+        size = entries[f].stat().st_size / 1024
         print(f"  ✓ {f:50s} ({size:.1f} KB)")
 else:
     print("  ✗ No ESP surface files found")
 
 # Find all HOMO files
 print("\n🔴 HOMO ORBITAL FILES:")
-homo_files = glob.glob("*HOMO*.png")
+homo_files = find_png("HOMO")
 if homo_files:
     for f in sorted(homo_files):
-        size = os.path.getsize(f) / 1024
+        size = entries[f].stat().st_size / 1024
         print(f"  ✓ {f:50s} ({size:.1f} KB)")
 else:
     print("  ✗ No HOMO orbital files found")
 
 # Find all LUMO files
 print("\n🔵 LUMO ORBITAL FILES:")
-lumo_files = glob.glob("*LUMO*.png")
+lumo_files = find_png("LUMO")
 if lumo_files:
     for f in sorted(lumo_files):
-        size = os.path.getsize(f) / 1024
+        size = entries[f].stat().st_size / 1024
         print(f"  ✓ {f:50s} ({size:.1f} KB)")
 else:
     print("  ✗ No LUMO orbital files found")
@@ -50,6 +61,23 @@ variations = {
     'hedragenin': ['hedragenin', 'hedrageinin', 'hedrageini', "'hedragenin HOMO_Orbital'"]
 }
 
+# File kinds and separators accepted between the molecule name and the
+# suffix, in order of preference (name_ESP_Surface.png first)
+kinds = [('ESP', 'ESP_Surface.png'), ('HOMO', 'HOMO_Orbital.png'), ('LUMO', 'LUMO_Orbital.png')]
+separators = ['_', '', ' ']
+
+# Index every file once by (molecule name, kind) -> [(preference, filename)],
+# so each name below is one dict lookup instead of nine membership probes
+index = {}
+for f in entries:
+    for kind, suffix in kinds:
+        if f.endswith(suffix):
+            prefix = f[:-len(suffix)]
+            for rank, sep in enumerate(separators):
+                if prefix.endswith(sep):
+                    name = prefix[:len(prefix) - len(sep)]
+                    index.setdefault((name, kind), []).append((rank, f))
+
 for mol in molecules:
     print(f"\n🧬 {mol.upper().replace('_', ' ')}:")
     
@@ -58,77 +86,37 @@ for mol in molecules:
     if mol in variations:
         names_to_try.extend(variations[mol])
     
-    found_esp = False
-    found_homo = False
-    found_lumo = False
-    
-    for name in names_to_try:
-        # ESP variations
-        esp_patterns = [
-            f"{name}_ESP_Surface.png",
-            f"{name}ESP_Surface.png",
-            f"{name} ESP_Surface.png"
-        ]
-        
-        for pattern in esp_patterns:
-            if os.path.exists(pattern):
-                print(f"  ✓ ESP:  {pattern}")
-                found_esp = True
-                break
-        
-        # HOMO variations
-        homo_patterns = [
-            f"{name}_HOMO_Orbital.png",
-            f"{name}HOMO_Orbital.png",
-            f"{name} HOMO_Orbital.png"
-        ]
-        
-        for pattern in homo_patterns:
-            if os.path.exists(pattern):
-                print(f"  ✓ HOMO: {pattern}")
-                found_homo = True
-                break
-        
-        # LUMO variations
-        lumo_patterns = [
-            f"{name}_LUMO_Orbital.png",
-            f"{name}LUMO_Orbital.png",
-            f"{name} LUMO_Orbital.png"
-        ]
-        
-        for pattern in lumo_patterns:
-            if os.path.exists(pattern):
-                print(f"  ✓ LUMO: {pattern}")
-                found_lumo = True
-                break
-        
-        if found_esp and found_homo and found_lumo:
-            break
+    # First variation that has each kind of file (best separator first);
+    # next() stops at the first hit instead of scanning every variation
+    hits = {kind: next((min(index[name, kind])[1] for name in names_to_try
+                        if (name, kind) in index), None)
+            for kind, _ in kinds}
     
-    if not found_esp:
-        print(f"  ✗ ESP:  Missing")
-    if not found_homo:
-        print(f"  ✗ HOMO: Missing")
-    if not found_lumo:
-        print(f"  ✗ LUMO: Missing")
+    for kind, hit in hits.items():
+        if hit:
+            print(f"  ✓ {kind + ':':6s}{hit}")
+    for kind, hit in hits.items():
+        if not hit:
+            print(f"  ✗ {kind + ':':6s}Missing")
 
 print("\n" + "=" * 70)
 print("RECOMMENDATIONS:")
 print("=" * 70)
 
-# Find what's actually there for hedragenin
-hedra_files = [f for f in glob.glob("*") if 'hedra' in f.lower() and f.endswith('.png')]
+# Find what's actually there for hedragenin, lowercasing each PNG name once
+lowered = [(f, f.lower()) for f in find_png('')]
+hedra_files = [(f, low) for f, low in lowered if 'hedra' in low]
 if hedra_files:
     print("\n📁 Found these hedragenin-related files:")
-    for f in hedra_files:
+    for f, _ in hedra_files:
         print(f"  • {f}")
     print("\nTo fix, rename them to standard format:")
-    for f in hedra_files:
-        if 'esp' in f.lower():
+    for f, low in hedra_files:
+        if 'esp' in low:
             print(f"  mv '{f}' 'hedragenin_ESP_Surface.png'")
-        elif 'homo' in f.lower():
+        elif 'homo' in low:
             print(f"  mv '{f}' 'hedragenin_HOMO_Orbital.png'")
-        elif 'lumo' in f.lower():
+        elif 'lumo' in low:
             print(f"  mv '{f}' 'hedragenin_LUMO_Orbital.png'")
 else:
     print("\n⚠️  No hedragenin files found at all!")
@@ -2,51 +2,139 @@
 """
 Create publication-quality figure layouts from molecular visualization images
 Matches the reference layout style with ESP surfaces and HOMO-LUMO orbitals
+
+Most of the run time is the LANCZOS resizing. Pillow-SIMD
+(pip uninstall pillow; pip install pillow-simd) is a drop-in replacement
+whose SSE4/AVX2 resampling speeds that up without any code changes.
 """
 
 from PIL import Image, ImageDraw, ImageFont
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import numpy as np
 import os
 import sys
 
-def create_esp_figure(molecules, output_file='ESP_Surface_Comparison.png'):
+# Resampling filter for all resizes: LANCZOS, the sharpest of Pillow's
+# filters, since the orbital and ESP renders are downscaled for publication.
+# Pillow builds the separable filter taps per call, but that is O(output
+# size) and negligible next to the convolution itself, so there is nothing
+# to gain from sharing a precomputed tap matrix between same-sized images
+RESAMPLE = Image.Resampling.LANCZOS
+
+FONT_BOLD = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+FONT_REGULAR = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+
+@functools.lru_cache(maxsize=None)
+def get_font(path, size):
+    """Load a TrueType font once per (path, size), falling back to PIL's default"""
+    try:
+        return ImageFont.truetype(path, size)
+    except OSError:
+        return ImageFont.load_default()
+
+@functools.lru_cache(maxsize=64)
+def load_and_resize(path, height, width=None):
+    """
+    Load an image as RGBA and resize it to the given height (width follows
+    the aspect ratio unless given). Cached per (path, height, width), so the
+    returned image is shared and must only be pasted, never drawn on.
+    """
+    img = Image.open(path)
+    # Let JPEG sources decode at a reduced DCT scale, keeping at least 2x the
+    # target so the final filter still has detail to work with (no-op for PNG)
+    img.draft('RGB', (2 * (width or height), 2 * height))
+    # Convert to RGBA if not already
+    if img.mode != 'RGBA':
+        img = img.convert('RGBA')
+    if width is None:
+        width = int(height * (img.width / img.height))
+    # reducing_gap box-reduces large sources by an integer factor (down to
+    # 2x the target) before the much more expensive resampling filter.
+    # Pillow ignores it for RGBA, so resize in premultiplied RGBa ourselves,
+    # which is what it does internally for RGBA anyway
+    img = img.convert('RGBa').resize((width, height), RESAMPLE, reducing_gap=2.0)
+    return img.convert('RGBA')
+
+@functools.lru_cache(maxsize=128)
+def render_text(text, font):
+    """Rasterize black text once onto a transparent tile covering its bounding box"""
+    left, top, right, bottom = font.getbbox(text)
+    tile = Image.new('RGBA', (right, bottom), (0, 0, 0, 0))
+    ImageDraw.Draw(tile).text((0, 0), text, fill='black', font=font)
+    return tile
+
+def paste_text(canvas, xy, text, font):
+    """
+    Place text rendered by render_text, so FreeType shapes each (text, font)
+    once; matches draw.text on both transparent RGBA and opaque RGB canvases
+    """
+    tile = render_text(text, font)
+    if canvas.mode == 'RGBA':
+        canvas.alpha_composite(tile, xy)
+    else:
+        canvas.paste(tile, xy, tile)
+
+def new_canvas(size, transparent):
+    """
+    Create a transparent RGBA canvas, or an opaque white RGB one when no
+    transparency is wanted (the EPS then needs no flattening pass)
+    """
+    if transparent:
+        return Image.new('RGBA', size, (255, 255, 255, 0))
+    return Image.new('RGB', size, 'white')
+
+def save_figure(canvas, output_file):
+    """Save the canvas as PNG (with any transparency) and as EPS on white"""
+    # Fast zlib level 1: a little larger, several times quicker to encode
+    canvas.save(output_file, 'PNG', compress_level=1)
+    print(f"\n✓ Saved: {output_file}")
+    
+    # EPS has no alpha, so a transparent canvas is flattened onto white first
+    if canvas.mode == 'RGBA':
+        canvas_white = Image.new('RGB', canvas.size, 'white')
+        canvas_white.paste(canvas, (0, 0), canvas)
+    else:
+        canvas_white = canvas
+    eps_file = output_file.replace('.png', '.eps')
+    canvas_white.save(eps_file, 'EPS')
+    print(f"✓ Saved: {eps_file}")
+
+def create_esp_figure(molecules, output_file='ESP_Surface_Comparison.png',
+                      transparent=True):
     """
     Create ESP surface comparison figure (similar to Fig. 11 reference)
     Layout: Side-by-side ESP surfaces with labels
+    transparent=False draws straight onto a white RGB canvas
     """
     print(f"Creating ESP surface comparison figure...")
     
     # Load images
-    images = []
+    esp_files = []
     labels = []
+    target_height = 800
     
     for mol_name, label in molecules:
         esp_file = f"{mol_name}_ESP_Surface.png"
         if os.path.exists(esp_file):
-            img = Image.open(esp_file)
-            # Convert to RGBA if not already
-            if img.mode != 'RGBA':
-                img = img.convert('RGBA')
-            images.append(img)
+            esp_files.append(esp_file)
             labels.append(label)
             print(f"  ✓ Loaded {esp_file}")
         else:
             print(f"  ✗ Missing {esp_file}")
     
-    if not images:
+    if not esp_files:
         print("No ESP images found!")
         return
     
-    # Calculate dimensions
-    n_images = len(images)
+    # Decode and resize all images to same height in parallel
+    # (PNG decode and resampling release the GIL)
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as pool:
+        resized_images = list(pool.map(load_and_resize, esp_files,
+                                       [target_height] * len(esp_files)))
     
-    # Resize all images to same height
-    target_height = 800
-    resized_images = []
-    for img in images:
-        aspect = img.width / img.height
-        new_width = int(target_height * aspect)
-        resized = img.resize((new_width, target_height), Image.Resampling.LANCZOS)
-        resized_images.append(resized)
+    # Calculate dimensions
+    n_images = len(resized_images)
     
     # Calculate canvas size
     total_width = sum(img.width for img in resized_images)
@@ -57,30 +145,27 @@ def create_esp_figure(molecules, output_file='ESP_Surface_Comparison.png'):
     canvas_width = total_width + margin * (n_images + 1)
     canvas_height = target_height + label_height + colorbar_height + margin * 3
     
-    # Create transparent canvas
-    canvas = Image.new('RGBA', (canvas_width, canvas_height), (255, 255, 255, 0))
+    # Create canvas
+    canvas = new_canvas((canvas_width, canvas_height), transparent)
     draw = ImageDraw.Draw(canvas)
     
-    # Try to load a font
-    try:
-        font_label = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 36)
-        font_caption = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 24)
-    except:
-        font_label = ImageFont.load_default()
-        font_caption = ImageFont.load_default()
+    # Fonts (loaded once per size, see get_font)
+    font_label = get_font(FONT_BOLD, 36)
+    font_caption = get_font(FONT_REGULAR, 24)
+    
+    # Label texts (A., B., C., etc.) and their ink widths, measured in one pass
+    label_texts = [f"{chr(65+i)}. {label}" for i, label in enumerate(labels)]
+    label_widths = [bbox[2] - bbox[0] for bbox in map(font_label.getbbox, label_texts)]
     
     # Place images with labels
     x_offset = margin
-    for i, (img, label) in enumerate(zip(resized_images, labels)):
-        # Draw label (A., B., C., etc.)
-        label_text = f"{chr(65+i)}. {label}"
-        bbox = draw.textbbox((0, 0), label_text, font=font_label)
-        text_width = bbox[2] - bbox[0]
+    for img, label_text, text_width in zip(resized_images, label_texts, label_widths):
+        # Draw label
         text_x = x_offset + (img.width - text_width) // 2
-        draw.text((text_x, margin), label_text, fill='black', font=font_label)
+        paste_text(canvas, (text_x, margin), label_text, font_label)
         
         # Paste image
-        canvas.paste(img, (x_offset, margin + label_height))
+        canvas.paste(img, (x_offset, margin + label_height), None if transparent else img)
         
         x_offset += img.width + margin
     
@@ -90,30 +175,24 @@ def create_esp_figure(molecules, output_file='ESP_Surface_Comparison.png'):
     caption_width = bbox[2] - bbox[0]
     caption_x = (canvas_width - caption_width) // 2
     caption_y = canvas_height - colorbar_height - margin
-    draw.text((caption_x, caption_y), caption, fill='black', font=font_caption)
+    paste_text(canvas, (caption_x, caption_y), caption, font_caption)
     
     # Add color scale legend
     colorbar_y = canvas_height - colorbar_height + 20
     colorbar_width = 600
     colorbar_x = (canvas_width - colorbar_width) // 2
     
-    # Draw gradient colorbar (red to white to blue)
-    for i in range(colorbar_width):
-        ratio = i / colorbar_width
-        if ratio < 0.5:
-            # Red to white
-            r = 255
-            g = int(255 * (ratio * 2))
-            b = int(255 * (ratio * 2))
-        else:
-            # White to blue
-            r = int(255 * (2 - ratio * 2))
-            g = int(255 * (2 - ratio * 2))
-            b = 255
-        
-        draw.line([(colorbar_x + i, colorbar_y), 
-                   (colorbar_x + i, colorbar_y + 30)], 
-                  fill=(r, g, b))
+    # Draw gradient colorbar (red to white to blue) as one array paste
+    ratio = np.arange(colorbar_width) / colorbar_width
+    # Branch-free ramps: red falls to 0 across the right half, blue rises to
+    # 255 across the left half and green follows whichever is lower
+    red = np.clip(2 * (1 - ratio), 0, 1) * 255
+    blue = np.clip(2 * ratio, 0, 1) * 255
+    green = np.minimum(red, blue)
+    alpha = np.full(colorbar_width, 255.0)
+    row = np.stack([red, green, blue, alpha], axis=-1).astype(np.uint8)
+    bar = np.broadcast_to(row, (31, colorbar_width, 4)).copy()
+    canvas.paste(Image.fromarray(bar), (colorbar_x, colorbar_y))
     
     # Draw colorbar border
     draw.rectangle([colorbar_x, colorbar_y, 
@@ -121,61 +200,56 @@ def create_esp_figure(molecules, output_file='ESP_Surface_Comparison.png'):
                    outline='black', width=2)
     
     # Add colorbar labels
-    draw.text((colorbar_x - 80, colorbar_y + 5), "-0.030", fill='black', font=font_caption)
-    draw.text((colorbar_x + colorbar_width + 10, colorbar_y + 5), "0.030", fill='black', font=font_caption)
+    paste_text(canvas, (colorbar_x - 80, colorbar_y + 5), "-0.030", font_caption)
+    paste_text(canvas, (colorbar_x + colorbar_width + 10, colorbar_y + 5), "0.030", font_caption)
     
-    # Save with transparency
-    canvas.save(output_file, 'PNG')
-    print(f"\n✓ Saved: {output_file}")
-    
-    # For EPS, create a white background version
-    canvas_white = Image.new('RGB', canvas.size, 'white')
-    canvas_white.paste(canvas, (0, 0), canvas)
-    eps_file = output_file.replace('.png', '.eps')
-    canvas_white.save(eps_file, 'EPS')
-    print(f"✓ Saved: {eps_file}")
+    # Save PNG and EPS
+    save_figure(canvas, output_file)
 
 
-def create_homo_lumo_figure(molecules, output_file='HOMO_LUMO_Comparison.png'):
+def create_homo_lumo_figure(molecules, output_file='HOMO_LUMO_Comparison.png',
+                            transparent=True):
     """
     Create HOMO-LUMO comparison figure (similar to Fig. 10 reference)
     Layout: Grid with LUMO on top, energy gap in middle, HOMO on bottom
+    transparent=False draws straight onto a white RGB canvas
     """
     print(f"\nCreating HOMO-LUMO comparison figure...")
     
-    # Load images
+    # Load images, resized to squares
     data = []
+    target_size = 600
     
-    for mol_name, label in molecules:
-        homo_file = f"{mol_name}_HOMO_Orbital.png"
-        lumo_file = f"{mol_name}_LUMO_Orbital.png"
-        
-        homo_img = None
-        lumo_img = None
-        
-        if os.path.exists(homo_file):
-            homo_img = Image.open(homo_file)
-            if homo_img.mode != 'RGBA':
-                homo_img = homo_img.convert('RGBA')
-            print(f"  ✓ Loaded {homo_file}")
-        else:
-            print(f"  ✗ Missing {homo_file}")
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as pool:
+        for mol_name, label in molecules:
+            homo_file = f"{mol_name}_HOMO_Orbital.png"
+            lumo_file = f"{mol_name}_LUMO_Orbital.png"
             
-        if os.path.exists(lumo_file):
-            lumo_img = Image.open(lumo_file)
-            if lumo_img.mode != 'RGBA':
-                lumo_img = lumo_img.convert('RGBA')
-            print(f"  ✓ Loaded {lumo_file}")
-        else:
-            print(f"  ✗ Missing {lumo_file}")
+            homo_found = os.path.exists(homo_file)
+            lumo_found = os.path.exists(lumo_file)
+            
+            if homo_found:
+                print(f"  ✓ Loaded {homo_file}")
+            else:
+                print(f"  ✗ Missing {homo_file}")
+                
+            if lumo_found:
+                print(f"  ✓ Loaded {lumo_file}")
+            else:
+                print(f"  ✗ Missing {lumo_file}")
+            
+            # Decode and resize both orbitals in the background
+            if homo_found and lumo_found:
+                data.append({
+                    'name': mol_name,
+                    'label': label,
+                    'homo': pool.submit(load_and_resize, homo_file, target_size, target_size),
+                    'lumo': pool.submit(load_and_resize, lumo_file, target_size, target_size)
+                })
         
-        if homo_img and lumo_img:
-            data.append({
-                'name': mol_name,
-                'label': label,
-                'homo': homo_img,
-                'lumo': lumo_img
-            })
+        for item in data:
+            item['homo'] = item['homo'].result()
+            item['lumo'] = item['lumo'].result()
     
     if not data:
         print("No HOMO-LUMO image pairs found!")
@@ -183,12 +257,6 @@ def create_homo_lumo_figure(molecules, output_file='HOMO_LUMO_Comparison.png'):
     
     n_molecules = len(data)
     
-    # Resize images
-    target_size = 600
-    for item in data:
-        item['homo'] = item['homo'].resize((target_size, target_size), Image.Resampling.LANCZOS)
-        item['lumo'] = item['lumo'].resize((target_size, target_size), Image.Resampling.LANCZOS)
-    
     # Calculate canvas dimensions
     margin = 40
     label_width = 120
@@ -198,102 +266,114 @@ def create_homo_lumo_figure(molecules, output_file='HOMO_LUMO_Comparison.png'):
     canvas_width = label_width + (target_size + margin) * n_molecules + margin
     canvas_height = header_height + target_size + gap_box_height + target_size + margin * 3
     
-    # Create transparent canvas
-    canvas = Image.new('RGBA', (canvas_width, canvas_height), (255, 255, 255, 0))
+    # Create canvas
+    canvas = new_canvas((canvas_width, canvas_height), transparent)
     draw = ImageDraw.Draw(canvas)
     
     # Fonts
-    try:
-        font_header = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 32)
-        font_label = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 28)
-        font_value = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 24)
-    except:
-        font_header = ImageFont.load_default()
-        font_label = ImageFont.load_default()
-        font_value = ImageFont.load_default()
+    font_header = get_font(FONT_BOLD, 32)
+    font_label = get_font(FONT_BOLD, 28)
+    font_value = get_font(FONT_REGULAR, 24)
     
     # Draw row labels
     lumo_y = header_height + margin
     gap_y = lumo_y + target_size + margin
     homo_y = gap_y + gap_box_height + margin
     
-    draw.text((20, lumo_y + target_size//2 - 20), "LUMO", fill='black', font=font_label)
-    draw.text((20, gap_y + gap_box_height//2 - 20), "ΔE", fill='black', font=font_label)
-    draw.text((20, homo_y + target_size//2 - 20), "HOMO", fill='black', font=font_label)
+    paste_text(canvas, (20, lumo_y + target_size//2 - 20), "LUMO", font_label)
+    paste_text(canvas, (20, gap_y + gap_box_height//2 - 20), "ΔE", font_label)
+    paste_text(canvas, (20, homo_y + target_size//2 - 20), "HOMO", font_label)
+    
+    # Column header texts and their ink widths, measured in one pass
+    header_texts = [f"{chr(65+i)}. {item['label']}" for i, item in enumerate(data)]
+    header_widths = [bbox[2] - bbox[0] for bbox in map(font_header.getbbox, header_texts)]
+    
+    # Energy gap values (calculated from DFT data)
+    gap_values = {
+        'control': '5.6099',
+        'lupeol': '7.2551',
+        'hedragenin': '4.9239',
+        'maslinic_acid': '4.9451'
+    }
+    
+    # The gap box and both arrows are identical in every column, so draw
+    # them once on a transparent tile spanning the gap row and its margins
+    # and paste that with its own mask, instead of five draw calls per column
+    tile_y = gap_y - margin
+    tile = Image.new('RGBA', (target_size, gap_box_height + 2 * margin), (0, 0, 0, 0))
+    tile_draw = ImageDraw.Draw(tile)
+    
+    # Energy gap box (placeholder - you can add actual values)
+    gap_box_x = target_size//2 - 100
+    gap_box_y = gap_y + gap_box_height//2 - 30 - tile_y
+    
+    tile_draw.rectangle([gap_box_x - 10, gap_box_y - 10,
+                         gap_box_x + 220, gap_box_y + 50],
+                        outline='black', width=2)
+    
+    # Arrow
+    arrow_x = target_size//2
+    arrow_top = gap_box_y - 20
+    arrow_bottom = gap_box_y + 60
+    
+    tile_draw.line([(arrow_x, lumo_y + target_size + 10 - tile_y),
+                    (arrow_x, arrow_top)], fill='black', width=3)
+    tile_draw.line([(arrow_x, arrow_bottom),
+                    (arrow_x, homo_y - 10 - tile_y)], fill='black', width=3)
+    
+    # Arrow heads
+    tile_draw.polygon([(arrow_x, arrow_top - 15),
+                       (arrow_x - 8, arrow_top),
+                       (arrow_x + 8, arrow_top)], fill='black')
+    tile_draw.polygon([(arrow_x, arrow_bottom + 15),
+                       (arrow_x - 8, arrow_bottom),
+                       (arrow_x + 8, arrow_bottom)], fill='black')
     
     # Place images and labels for each molecule
     x_offset = label_width + margin
     
-    for i, item in enumerate(data):
+    for item, header_text, text_width in zip(data, header_texts, header_widths):
         # Column header
-        header_text = f"{chr(65+i)}. {item['label']}"
-        bbox = draw.textbbox((0, 0), header_text, font=font_header)
-        text_width = bbox[2] - bbox[0]
         text_x = x_offset + (target_size - text_width) // 2
-        draw.text((text_x, 20), header_text, fill='black', font=font_header)
+        paste_text(canvas, (text_x, 20), header_text, font_header)
         
         # LUMO image
-        canvas.paste(item['lumo'], (x_offset, lumo_y))
-        
-        # Energy gap box (placeholder - you can add actual values)
-        gap_box_x = x_offset + target_size//2 - 100
-        gap_box_y = gap_y + gap_box_height//2 - 30
+        canvas.paste(item['lumo'], (x_offset, lumo_y), None if transparent else item['lumo'])
         
-        draw.rectangle([gap_box_x - 10, gap_box_y - 10,
-                       gap_box_x + 220, gap_box_y + 50],
-                      outline='black', width=2)
-        
-     # Energy gap values (calculated from DFT data)
-        gap_values = {
-            'control': '5.6099',
-            'lupeol': '7.2551',
-            'hedragenin': '4.9239',
-            'maslinic_acid': '4.9451'
-        }
+        # Gap box and arrows
+        canvas.paste(tile, (x_offset, tile_y), tile)
         
         gap_value = gap_values.get(item['name'], '0.XXXX')
         gap_text = f"ΔE = {gap_value}"
-        draw.text((gap_box_x, gap_box_y), gap_text, fill='black', font=font_value)
-        
-        # Arrow
-        arrow_x = x_offset + target_size//2
-        arrow_top = gap_box_y - 20
-        arrow_bottom = gap_box_y + 60
-        
-        draw.line([(arrow_x, lumo_y + target_size + 10),
-                   (arrow_x, arrow_top)], fill='black', width=3)
-        draw.line([(arrow_x, arrow_bottom),
-                   (arrow_x, homo_y - 10)], fill='black', width=3)
-        
-        # Arrow heads
-        draw.polygon([(arrow_x, arrow_top - 15),
-                     (arrow_x - 8, arrow_top),
-                     (arrow_x + 8, arrow_top)], fill='black')
-        draw.polygon([(arrow_x, arrow_bottom + 15),
-                     (arrow_x - 8, arrow_bottom),
-                     (arrow_x + 8, arrow_bottom)], fill='black')
+        paste_text(canvas, (x_offset + gap_box_x, tile_y + gap_box_y), gap_text, font_value)
         
         # HOMO image
-        canvas.paste(item['homo'], (x_offset, homo_y))
+        canvas.paste(item['homo'], (x_offset, homo_y), None if transparent else item['homo'])
         
         x_offset += target_size + margin
     
     # Add caption
     caption = "HOMO-LUMO orbitals and energy gaps. Red and green denote orbital phases; ΔE reflects chemical reactivity."
     
-    # Word wrap caption
+    # Word wrap caption, measuring each distinct word once and keeping a
+    # running line width instead of re-measuring the whole line per word
     words = caption.split()
+    max_width = canvas_width - 100
+    space_width = font_value.getlength(' ')
+    word_widths = {word: font_value.getlength(word) for word in set(words)}
     lines = []
     current_line = []
+    current_width = 0
     
     for word in words:
-        current_line.append(word)
-        test_line = ' '.join(current_line)
-        bbox = draw.textbbox((0, 0), test_line, font=font_value)
-        if bbox[2] - bbox[0] > canvas_width - 100:
-            current_line.pop()
+        added_width = word_widths[word] + (space_width if current_line else 0)
+        if current_line and current_width + added_width > max_width:
             lines.append(' '.join(current_line))
             current_line = [word]
+            current_width = word_widths[word]
+        else:
+            current_line.append(word)
+            current_width += added_width
     
     if current_line:
         lines.append(' '.join(current_line))
@@ -304,19 +384,11 @@ def create_homo_lumo_figure(molecules, output_file='HOMO_LUMO_Comparison.png'):
         bbox = draw.textbbox((0, 0), line, font=font_value)
         text_width = bbox[2] - bbox[0]
         text_x = (canvas_width - text_width) // 2
-        draw.text((text_x, caption_y), line, fill='black', font=font_value)
+        paste_text(canvas, (text_x, caption_y), line, font_value)
         caption_y += 30
     
-    # Save with transparency
-    canvas.save(output_file, 'PNG')
-    print(f"\n✓ Saved: {output_file}")
-    
-    # For EPS, create a white background version
-    canvas_white = Image.new('RGB', canvas.size, 'white')
-    canvas_white.paste(canvas, (0, 0), canvas)
-    eps_file = output_file.replace('.png', '.eps')
-    canvas_white.save(eps_file, 'EPS')
-    print(f"✓ Saved: {eps_file}")
+    # Save PNG and EPS
+    save_figure(canvas, output_file)
 
 
 def main():
@@ -6,9 +6,19 @@ Compatible with Python 2.7+ and Python 3.x
 """
 
 from __future__ import print_function
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageColor, ImageDraw, ImageFont
 import os
 
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:  # Python 2 without the futures backport
+    ThreadPoolExecutor = None
+
+try:
+    import pyvips
+except (ImportError, OSError):  # OSError: Python binding present, libvips missing
+    pyvips = None
+
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
@@ -38,6 +48,16 @@ OUTPUT_FILE = 'final_composite_figure.png'
 # DPI setting (must match input images)
 DPI = 1500
 
+# Integer downsampling factor for drafts/previews (1 = full resolution).
+# Frames are decoded at 1/SCALE_FACTOR size, and spacing, fonts, grid
+# lines and the saved DPI all scale with it so the layout is unchanged.
+SCALE_FACTOR = 1
+
+# Build and save the composite as a streaming libvips pipeline instead of
+# one in-memory Pillow canvas (needs pyvips). Peak memory stays at a few
+# scanline strips; the pixels are identical, only the PNG bytes differ.
+USE_LIBVIPS = False
+
 # Spacing and padding (in pixels)
 PADDING = 100  # Outer padding around entire grid
 IMAGE_SPACING = 80  # Space between images
@@ -54,12 +74,29 @@ GRID_WIDTH = 3  # Width of grid lines in pixels
 # MAIN SCRIPT
 # ============================================================================
 
+def scaled(pixels):
+    """Scale a full-resolution pixel size by SCALE_FACTOR."""
+    return max(1, int(round(pixels / float(SCALE_FACTOR))))
+
+
+def load_image(filepath):
+    """Open and fully decode one image (runs in a worker thread)."""
+    img = Image.open(filepath)
+    if SCALE_FACTOR > 1:
+        size = (img.width // SCALE_FACTOR, img.height // SCALE_FACTOR)
+        # draft() lets JPEG decode straight at reduced scale; it is a no-op
+        # for PNG, so finish with a resize whenever the size still differs
+        img.draft('RGB', size)
+        if img.size != size:
+            img = img.resize(size, Image.BILINEAR)
+    img.load()
+    return img
+
+
 def load_images():
     """Load all images and return as a 2D list (rows x cols)."""
-    images = []
-    
+    filepaths = []
     for molecule in MOLECULES:
-        row_images = []
         for time_point in TIME_POINTS:
             filename = "{}_frame_{}.png".format(molecule, time_point)
             filepath = os.path.join(INPUT_DIR, filename)
@@ -67,13 +104,26 @@ def load_images():
             if not os.path.exists(filepath):
                 raise IOError("Image not found: {}".format(filepath))
             
-            img = Image.open(filepath)
-            print("Loaded: {} - Size: {}".format(filename, img.size))
-            row_images.append(img)
-        
-        images.append(row_images)
+            filepaths.append(filepath)
+    
+    # With libvips full-resolution frames stay lazy and are streamed into the
+    # output (draft frames are small and go through Pillow's resize so the
+    # pixels match); otherwise Pillow releases the GIL while decoding PNGs,
+    # so decode them in parallel here instead of lazily on paste()
+    if USE_LIBVIPS and SCALE_FACTOR == 1:
+        loaded = [pyvips.Image.new_from_file(filepath, access='sequential')
+                  for filepath in filepaths]
+    elif ThreadPoolExecutor is not None:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            loaded = list(pool.map(load_image, filepaths))
+    else:
+        loaded = [load_image(filepath) for filepath in filepaths]
     
-    return images
+    for filepath, img in zip(filepaths, loaded):
+        print("Loaded: {} - Size: {}".format(os.path.basename(filepath), (img.width, img.height)))
+    
+    cols = len(TIME_POINTS)
+    return [loaded[i:i + cols] for i in range(0, len(loaded), cols)]
 
 
 def get_font(size):
@@ -98,53 +148,84 @@ def get_font(size):
     return ImageFont.load_default()
 
 
+# Measured text sizes keyed by (text, font); labels repeat across rows
+TEXT_SIZE_CACHE = {}
+
+
 def get_text_size(draw, text, font):
     """Get text size in a way compatible with both old and new Pillow versions."""
-    try:
-        # New Pillow API (9.2.0+)
-        bbox = draw.textbbox((0, 0), text, font=font)
-        return bbox[2] - bbox[0], bbox[3] - bbox[1]
-    except AttributeError:
-        # Old Pillow API
-        return draw.textsize(text, font=font)
+    key = (text, font)
+    if key not in TEXT_SIZE_CACHE:
+        try:
+            # New Pillow API (9.2.0+)
+            bbox = draw.textbbox((0, 0), text, font=font)
+            TEXT_SIZE_CACHE[key] = bbox[2] - bbox[0], bbox[3] - bbox[1]
+        except AttributeError:
+            # Old Pillow API
+            TEXT_SIZE_CACHE[key] = draw.textsize(text, font=font)
+    return TEXT_SIZE_CACHE[key]
 
 
-def create_composite_grid(images):
-    """Create the final composite image with labels."""
+# Rendered label tiles keyed by (text, font); each label is rasterized once
+LABEL_CACHE = {}
+
+
+def render_label(draw, text, font):
+    """Rasterize a black label once into a transparent tile for reuse."""
+    key = (text, font)
+    if key not in LABEL_CACHE:
+        try:
+            right, bottom = draw.textbbox((0, 0), text, font=font)[2:]
+        except AttributeError:
+            right, bottom = draw.textsize(text, font=font)
+        tile = Image.new('RGBA', (right, bottom), (0, 0, 0, 0))
+        ImageDraw.Draw(tile).text((0, 0), text, fill='black', font=font)
+        LABEL_CACHE[key] = tile
+    return LABEL_CACHE[key]
+
+
+def grid_layout(images):
+    """Return the canvas size and the placed items, in paint order.
+
+    Items are ('label', tile, x, y), ('image', img, x, y) and
+    ('border', [x0, y0, x1, y1]); both canvas backends paint from this list.
+    """
     
     # Get dimensions of a single image (assuming all are the same size)
-    img_width, img_height = images[0][0].size
+    img_width, img_height = images[0][0].width, images[0][0].height
     
     # Calculate canvas dimensions
     rows = len(images)
     cols = len(images[0])
     
     # Width: left padding + images + spacing + right padding
-    canvas_width = (PADDING + (cols * img_width) + ((cols - 1) * IMAGE_SPACING) + PADDING)
+    padding, spacing = scaled(PADDING), scaled(IMAGE_SPACING)
+    canvas_width = (padding + (cols * img_width) + ((cols - 1) * spacing) + padding)
     
     # Height: top padding + (images + row labels + time labels + spacing for each row) + bottom padding
-    row_label_height = 400  # Space for row labels above each row
-    time_label_height = 300  # Space for time labels below each row
-    canvas_height = (PADDING + 
-                     (rows * (row_label_height + img_height + time_label_height + IMAGE_SPACING)) + 
-                     PADDING)
+    row_label_height = scaled(400)  # Space for row labels above each row
+    time_label_height = scaled(300)  # Space for time labels below each row
+    canvas_height = (padding + 
+                     (rows * (row_label_height + img_height + time_label_height + spacing)) + 
+                     padding)
     
-    # Create white canvas
-    canvas = Image.new('RGB', (canvas_width, canvas_height), 'white')
-    draw = ImageDraw.Draw(canvas)
+    # Text is only measured here, so a scratch surface is enough
+    draw = ImageDraw.Draw(Image.new('RGB', (1, 1), 'white'))
     
     # Load fonts
-    font_time = get_font(FONT_SIZE_TIME)
-    font_row = get_font(FONT_SIZE_ROW)
+    font_time = get_font(scaled(FONT_SIZE_TIME))
+    font_row = get_font(scaled(FONT_SIZE_ROW))
     
     # Starting positions
-    start_x = PADDING
-    start_y = PADDING
+    start_x = padding
+    start_y = padding
+    
+    items = []
     
     # Place images and labels
     for row_idx, row_images in enumerate(images):
         # Calculate Y position for this row
-        current_y_row_label = start_y + row_idx * (row_label_height + img_height + time_label_height + IMAGE_SPACING)
+        current_y_row_label = start_y + row_idx * (row_label_height + img_height + time_label_height + spacing)
         current_y_images = current_y_row_label + row_label_height
         
         # Draw row label (left-aligned with the first image in the row)
@@ -155,45 +236,112 @@ def create_composite_grid(images):
         row_label_x = start_x
         row_label_y = current_y_row_label + (row_label_height - text_height) // 2
         
-        draw.text((row_label_x, row_label_y), row_label, fill='black', font=font_row)
+        items.append(('label', render_label(draw, row_label, font_row), row_label_x, row_label_y))
         
         # Place images in this row
         for col_idx, img in enumerate(row_images):
-            current_x = start_x + col_idx * (img_width + IMAGE_SPACING)
+            current_x = start_x + col_idx * (img_width + spacing)
             
             # Paste image
-            canvas.paste(img, (current_x, current_y_images))
+            items.append(('image', img, current_x, current_y_images))
             
             # Draw border/grid around image
             if DRAW_GRID:
-                # Draw rectangle around the image
-                draw.rectangle(
-                    [current_x, current_y_images, 
-                     current_x + img_width, current_y_images + img_height],
-                    outline=GRID_COLOR,
-                    width=GRID_WIDTH
-                )
+                items.append(('border', [current_x, current_y_images, 
+                                         current_x + img_width, current_y_images + img_height]))
             
             # Draw time label below image (centered)
             time_label = TIME_LABELS[col_idx]
             text_width, text_height = get_text_size(draw, time_label, font_time)
             
             label_x = current_x + (img_width - text_width) // 2
-            label_y = current_y_images + img_height + 80  # Increased spacing from 50 to 80
+            label_y = current_y_images + img_height + scaled(80)  # Increased spacing from 50 to 80
             
-            draw.text((label_x, label_y), time_label, fill='black', font=font_time)
+            items.append(('label', render_label(draw, time_label, font_time), label_x, label_y))
+    
+    return (canvas_width, canvas_height), items
+
+
+def create_composite_grid(images):
+    """Create the final composite image with labels."""
+    size, items = grid_layout(images)
+    
+    # Create white canvas
+    canvas = Image.new('RGB', size, 'white')
+    draw = ImageDraw.Draw(canvas)
+    
+    for item in items:
+        if item[0] == 'image':
+            canvas.paste(item[1], item[2:])
+        elif item[0] == 'label':
+            canvas.paste(item[1], item[2:], item[1])
+        else:
+            draw.rectangle(item[1], outline=GRID_COLOR, width=scaled(GRID_WIDTH))
+    
+    return canvas
+
+
+def create_composite_grid_vips(images):
+    """Build the same composite as a lazy libvips pipeline.
+    
+    Nothing is rendered until the image is saved, and then only a few
+    scanline strips are held in memory instead of the whole canvas.
+    """
+    size, items = grid_layout(images)
+    
+    canvas = pyvips.Image.black(size[0], size[1], bands=3).new_from_image([255, 255, 255])
+    canvas = canvas.copy(interpretation='srgb')
+    grid_rgb = list(ImageColor.getrgb(GRID_COLOR))
+    grid_width = scaled(GRID_WIDTH)
+    
+    for item in items:
+        if item[0] == 'image':
+            img = item[1]
+            if isinstance(img, Image.Image):
+                img = img.convert('RGB')
+                img = pyvips.Image.new_from_memory(img.tobytes(), img.width, img.height, 3, 'uchar')
+            if img.bands > 3:
+                img = img.extract_band(0, n=3)
+            canvas = canvas.insert(img, item[2], item[3])
+        elif item[0] == 'label':
+            # Tiles can overlap their neighbours, so blend through alpha, and
+            # only over the area they cover rather than the whole canvas. The
+            # blend itself is Pillow's masked paste, so the glyph edges round
+            # exactly as in create_composite_grid
+            x, y = item[2], item[3]
+            w = min(item[1].width, size[0] - x)
+            h = min(item[1].height, size[1] - y)
+            under = canvas.crop(x, y, w, h)
+            patch = Image.frombytes('RGB', (w, h), under.write_to_memory())
+            tile = item[1].crop((0, 0, w, h))
+            patch.paste(tile, (0, 0), tile)
+            patch = pyvips.Image.new_from_memory(patch.tobytes(), w, h, 3, 'uchar')
+            canvas = canvas.insert(patch.copy(interpretation='srgb'), x, y)
+        else:
+            # Same pixels as draw.rectangle(outline, width): inclusive box, inner stroke
+            x0, y0, x1, y1 = item[1]
+            strips = [(x0, y0, x1 - x0 + 1, grid_width),
+                      (x0, y1 - grid_width + 1, x1 - x0 + 1, grid_width),
+                      (x0, y0, grid_width, y1 - y0 + 1),
+                      (x1 - grid_width + 1, y0, grid_width, y1 - y0 + 1)]
+            for x, y, w, h in strips:
+                strip = pyvips.Image.black(w, h, bands=3).new_from_image(grid_rgb)
+                canvas = canvas.insert(strip, x, y)
     
     return canvas
 
 
 def main():
     """Main execution function."""
+    if USE_LIBVIPS and pyvips is None:
+        raise ImportError("USE_LIBVIPS is set but pyvips/libvips is not installed")
+    
     print("=" * 70)
     print("MD Trajectory Grid Compositor")
     print("=" * 70)
     print("\nInput directory: {}".format(INPUT_DIR))
     print("Output file: {}".format(OUTPUT_FILE))
-    print("Target DPI: {}".format(DPI))
+    print("Target DPI: {}".format(DPI // SCALE_FACTOR))
     print("\nGrid layout: {} rows × {} columns".format(len(MOLECULES), len(TIME_POINTS)))
     print("\nLoading images...")
     
@@ -204,18 +352,26 @@ def main():
     print("\nCreating composite grid...")
     
     # Create composite
-    composite = create_composite_grid(images)
+    if USE_LIBVIPS:
+        composite = create_composite_grid_vips(images)
+    else:
+        composite = create_composite_grid(images)
     
-    print("\nComposite dimensions: {} × {} pixels".format(composite.size[0], composite.size[1]))
+    print("\nComposite dimensions: {} × {} pixels".format(composite.width, composite.height))
     
     # Save with high DPI
     print("\nSaving composite image to: {}".format(OUTPUT_FILE))
-    composite.save(OUTPUT_FILE, dpi=(DPI, DPI), quality=100)
+    if USE_LIBVIPS:
+        # libvips resolution is in pixels per millimetre
+        composite = composite.copy(xres=DPI / SCALE_FACTOR / 25.4, yres=DPI / SCALE_FACTOR / 25.4)
+        composite.pngsave(OUTPUT_FILE, compression=6)
+    else:
+        composite.save(OUTPUT_FILE, dpi=(DPI // SCALE_FACTOR, DPI // SCALE_FACTOR), quality=100)
     
     print("\n✓ Composite image created successfully!")
     print("  File: {}".format(OUTPUT_FILE))
-    print("  Size: {} × {} pixels".format(composite.size[0], composite.size[1]))
-    print("  DPI: {}".format(DPI))
+    print("  Size: {} × {} pixels".format(composite.width, composite.height))
+    print("  DPI: {}".format(DPI // SCALE_FACTOR))
     print("=" * 70)
 
 
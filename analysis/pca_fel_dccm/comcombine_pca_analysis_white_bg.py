@@ -1,18 +1,16 @@
 import matplotlib.pyplot as plt
 import numpy as np
-import seaborn as sns
 from scipy import stats
 import os
 import re
+from plot_style import apply_white_style
 
 # Set matplotlib to use Agg backend
 import matplotlib
 matplotlib.use('Agg')
 
 # Set clean style with WHITE background
-sns.set_style("white")
-plt.rcParams['font.family'] = 'sans-serif'
-plt.rcParams['font.sans-serif'] = ['Arial', 'Helvetica', 'DejaVu Sans']
+apply_white_style()
 
 def read_xvg_safe(filename):
     """Safely read XVG files"""
@@ -39,11 +37,18 @@ def read_xvg_safe(filename):
         print(f"Error reading {filename}: {e}")
         return np.array([]), np.array([])
 
+# A colour line, e.g. "A  c #0000FF " /* "-0.0143" */. The opening quote
+# comes first so the regex engine can skip ahead to each '"', and the
+# lookbehind then requires it to start a line; [^\S\n] keeps every match
+# on one line
+XPM_COLOR_LINE_RE = re.compile(r'"(?<![^\n]")(.)[^\S\n]+c[^\S\n]+\S+[^\S\n]+"[^\S\n]*/\*[^\S\n]*"([^"\n]*)"')
+
 def parse_prob_xpm_file(xpm_file):
     """Parse GROMACS probability XPM file"""
     try:
         with open(xpm_file, 'r') as f:
-            lines = f.readlines()
+            text = f.read()
+        lines = text.splitlines(keepends=True)
         
         # Find dimensions
         width, height, ncolors = None, None, None
@@ -58,24 +63,31 @@ def parse_prob_xpm_file(xpm_file):
         if not width:
             return None
         
-        # Parse color map
+        # Parse color map: one finditer over the whole text with the
+        # precompiled pattern instead of a re.match call per line
         color_dict = {}
-        for line in lines:
-            match = re.match(r'"(.)\s+c\s+\S+\s+"\s*/\*\s*"([^"]*)"', line)
-            if match:
-                char = match.group(1)
-                value_str = match.group(2).strip()
-                try:
-                    value = float(value_str)
-                    color_dict[char] = value
-                except ValueError:
-                    pass
+        for match in XPM_COLOR_LINE_RE.finditer(text):
+            char = match.group(1)
+            value_str = match.group(2).strip()
+            try:
+                value = float(value_str)
+                color_dict[char] = value
+            except ValueError:
+                pass
         
         if len(color_dict) == 0:
             return None
         
-        # Parse data matrix
-        matrix_data = []
+        # Byte-indexed lookup table, so each row is decoded by one numpy
+        # gather instead of a dict.get per character; characters without
+        # a colour entry still decode to 0.0
+        lut = np.zeros(256, dtype=np.float64)
+        for char, value in color_dict.items():
+            lut[ord(char)] = value
+        
+        # Parse data matrix straight into a preallocated array
+        matrix = np.empty((height, width), dtype=np.float64)
+        n_rows = 0
         reading_data = False
         
         for line in lines:
@@ -86,15 +98,15 @@ def parse_prob_xpm_file(xpm_file):
                 match = re.search(r'"([^"]+)"', line)
                 if match:
                     row_chars = match.group(1)
-                    row_values = [color_dict.get(c, 0.0) for c in row_chars]
                     
-                    if len(row_values) == width:
-                        matrix_data.append(row_values)
+                    if len(row_chars) == width:
+                        matrix[n_rows] = lut[np.frombuffer(row_chars.encode('latin-1'), dtype=np.uint8)]
+                        n_rows += 1
                     
-                    if len(matrix_data) >= height:
+                    if n_rows >= height:
                         break
         
-        return np.array(matrix_data) if matrix_data else None
+        return matrix[:n_rows] if n_rows else None
         
     except Exception as e:
         print(f"Error parsing {xpm_file}: {e}")
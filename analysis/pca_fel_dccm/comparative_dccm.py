@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Comparative DCCM Analysis - transparent and white background versions
+Fixed aspect ratios and proper spacing; both versions are saved from one
+parse of the XPM files and one figure
+"""
+import matplotlib.pyplot as plt
+import numpy as np
+import os
+import sys
+from xpm_io import parse_xpm_cached
+from plot_style import apply_white_style
+
+# raster_io.py (shared PNG/TIFF writer) lives one directory up
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from raster_io import render_rgba, save_png_tiff
+
+# Set matplotlib backend
+import matplotlib
+matplotlib.use('Agg')
+
+# Set clean style
+apply_white_style()
+
+# Systems data
+systems = {
+    'A) Control Complex': 'control_covar.xpm',
+    'B) Hedragenin Analogue Complex': 'hedragenin_covar.xpm',
+    'C) Lupeol Analogue Complex': 'lupeol_covar.xpm',
+    'D) Maslinic Acid Analogue Complex': 'maslinic_acid_covar.xpm'
+}
+
+# Define positions for subplots - FIXED for equal sizes
+plot_size = 0.38  # Square plots
+left_margin = 0.08
+right_col = 0.54
+top_row = 0.54
+bottom_row = 0.08
+
+positions = [
+    [left_margin, top_row, plot_size, plot_size],      # A) Top-left
+    [right_col, top_row, plot_size, plot_size],        # B) Top-right
+    [left_margin, bottom_row, plot_size, plot_size],   # C) Bottom-left
+    [right_col, bottom_row, plot_size, plot_size]      # D) Bottom-right
+]
+
+def load_matrices():
+    """Parse every available covariance XPM, keyed by system name"""
+    all_matrices = {}
+    for system_name, xpm_file in systems.items():
+        if os.path.exists(xpm_file):
+            matrix = parse_xpm_cached(xpm_file)
+            if matrix is not None:
+                all_matrices[system_name] = matrix
+    return all_matrices
+
+def symmetric_range(all_matrices):
+    """Colour limits symmetric around zero from the global 2nd/98th percentiles"""
+    if not all_matrices:
+        return -0.1, 0.1
+
+    # One scratch buffer for all systems; percentile may partition it in place
+    all_values = np.empty(sum(m.size for m in all_matrices.values()), dtype=np.float32)
+    offset = 0
+    for m in all_matrices.values():
+        all_values[offset:offset + m.size] = m.ravel()
+        offset += m.size
+    percentile_min, percentile_max = np.percentile(all_values, [2, 98], overwrite_input=True)
+    vmax = max(abs(percentile_min), abs(percentile_max))
+    vmin = -vmax
+
+    print(f"Using symmetric scale: [{vmin:.4f}, {vmax:.4f}]")
+    return vmin, vmax
+
+def _style_ax(ax, title):
+    """Apply the shared square panel, title, axis labels, spines and ticks"""
+    ax.set_title(title, fontsize=11, fontweight='normal', pad=8)
+    ax.set_xlabel('Residue Index', fontsize=10)
+    ax.set_ylabel('Residue Index', fontsize=10)
+    ax.set_aspect('equal')
+    for spine in ax.spines.values():
+        spine.set_color('black')
+        spine.set_linewidth(0.8)
+    ax.tick_params(labelsize=9, length=3, width=0.8)
+
+def build_figure(all_matrices, vmin, vmax):
+    """Draw the 2x2 DCCM figure on white; the transparent save clears the backgrounds"""
+    fig = plt.figure(figsize=(16, 12), facecolor='white')
+
+    # Add main title
+    fig.suptitle('Comparative Dynamic Cross-Correlation Matrix Analysis',
+                 fontsize=16, fontweight='normal', y=0.96)
+
+    for idx, (system_name, xpm_file) in enumerate(systems.items()):
+        ax = fig.add_axes(positions[idx])
+        ax.set_facecolor('white')
+
+        try:
+            if system_name in all_matrices:
+                dccm_matrix = all_matrices[system_name]
+
+                # Plot DCCM with enhanced contrast
+                im = ax.imshow(dccm_matrix, cmap='RdBu_r', vmin=vmin, vmax=vmax,
+                             aspect='equal', interpolation='none')
+
+                # Add colorbar with white background
+                cbar = plt.colorbar(im, ax=ax, pad=0.02, fraction=0.046)
+                cbar.set_label('Covariance (nm²)', fontsize=9, labelpad=8)
+                cbar.ax.tick_params(labelsize=8, length=2)
+                cbar.outline.set_linewidth(0.8)
+                cbar.ax.set_facecolor('white')
+                cbar.ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x:.3f}'))
+
+                print(f"✓ Successfully plotted DCCM for {system_name}")
+                print(f"   Range: [{dccm_matrix.min():.4f}, {dccm_matrix.max():.4f}]")
+
+            elif os.path.exists(xpm_file):
+                ax.text(0.5, 0.5, 'Error parsing data',
+                       ha='center', va='center', transform=ax.transAxes,
+                       fontsize=10, style='italic', color='gray')
+            else:
+                ax.text(0.5, 0.5, 'File not found',
+                       ha='center', va='center', transform=ax.transAxes,
+                       fontsize=10, style='italic', color='gray')
+
+        except Exception as e:
+            print(f"Error processing {system_name}: {e}")
+            ax.text(0.5, 0.5, 'Error loading data',
+                   ha='center', va='center', transform=ax.transAxes,
+                   fontsize=10, style='italic', color='gray')
+
+        # Clean styling, applied once whichever branch filled the panel
+        _style_ax(ax, system_name)
+
+    return fig
+
+def save_transparent(fig):
+    """PNG and EPS with TRANSPARENT figure, panel and colorbar backgrounds"""
+    fig.savefig('comparative_dccm_transparent.png', dpi=300, bbox_inches='tight',
+                facecolor='none', edgecolor='none', transparent=True)
+    fig.savefig('comparative_dccm_transparent.eps', format='eps', dpi=300,
+                bbox_inches='tight', transparent=True)
+    print("\n✓ Saved comparative_dccm_transparent.png and .eps with TRANSPARENT background")
+
+    print("\n" + "="*60)
+    print("FEATURES:")
+    print("  ✓ Transparent background")
+    print("  ✓ Equal aspect ratios (square plots)")
+    print("  ✓ Consistent spacing")
+    print("  ✓ All subplots same size")
+    print("="*60)
+
+def save_white(fig):
+    """900 DPI TIFF/PNG plus EPS, PDF, SVG (and EMF if pyemf is installed) on WHITE"""
+    OUTPUT_FILENAME = 'comparative_dccm_white'
+    # Rasterize once at 900 DPI; the PNG and TIFF are both encoded from this
+    # RGBA buffer instead of rendering the figure again for each
+    save_png_tiff(render_rgba(fig, 900, facecolor='white', edgecolor='none'),
+                  OUTPUT_FILENAME, 900)
+
+    # fig.savefig rather than plt.savefig: pyplot redraws the whole figure
+    # after every save, which nothing here displays
+    fig.savefig(f'{OUTPUT_FILENAME}.eps', format='eps', dpi=300,
+                bbox_inches='tight', facecolor='white', edgecolor='none')  # EPS
+    fig.savefig(f'{OUTPUT_FILENAME}.pdf', format='pdf', bbox_inches='tight',
+                facecolor='white', edgecolor='none')  # PDF
+    fig.savefig(f'{OUTPUT_FILENAME}.svg', format='svg', bbox_inches='tight',
+                facecolor='white', edgecolor='none')  # SVG
+
+    # For EMF format
+    try:
+        import pyemf
+        fig.savefig(f'{OUTPUT_FILENAME}.emf', format='emf', bbox_inches='tight',
+                    facecolor='white', edgecolor='none')  # EMF
+        print(f"\n✓ Saved {OUTPUT_FILENAME}.tiff, .png, .eps, .pdf, .svg, .emf with WHITE background")
+    except ImportError:
+        print("pyemf not available, skipping EMF format")
+        print(f"\n✓ Saved {OUTPUT_FILENAME}.tiff, .png, .eps, .pdf, .svg with WHITE background")
+
+    print("\n" + "="*60)
+    print("FEATURES:")
+    print("  ✓ White background for publishing")
+    print("  ✓ Equal aspect ratios (square plots)")
+    print("  ✓ Consistent spacing")
+    print("  ✓ All subplots same size")
+    print("  ✓ High resolution (900 DPI TIFF & PNG)")
+    print("  ✓ Multiple formats: PNG, TIFF, EPS, PDF, SVG, EMF")
+    print("  ✓ Publication-ready format")
+    print("="*60)
+
+BACKGROUNDS = {
+    'transparent': save_transparent,
+    'white': save_white,
+}
+
+def main(backgrounds=('transparent', 'white')):
+    """Parse once, draw once, and save the requested background versions"""
+    all_matrices = load_matrices()
+    vmin, vmax = symmetric_range(all_matrices)
+    fig = build_figure(all_matrices, vmin, vmax)
+    for background in backgrounds:
+        BACKGROUNDS[background](fig)
+    plt.close(fig)
+
+if __name__ == "__main__":
+    main()
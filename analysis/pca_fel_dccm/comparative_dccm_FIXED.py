@@ -1,79 +1,15 @@
 import matplotlib.pyplot as plt
 import numpy as np
-import seaborn as sns
 import os
-import re
+from xpm_io import parse_xpm
+from plot_style import apply_white_style
 
 # Set matplotlib to use Agg backend
 import matplotlib
 matplotlib.use('Agg')
 
 # Set clean style
-sns.set_style("white")
-plt.rcParams['font.family'] = 'sans-serif'
-plt.rcParams['font.sans-serif'] = ['Arial', 'Helvetica', 'DejaVu Sans']
-
-def parse_xpm_file(xpm_file):
-    """Parse GROMACS XPM file - FIXED VERSION"""
-    try:
-        with open(xpm_file, 'r') as f:
-            lines = f.readlines()
-        
-        # Find dimensions
-        width, height, ncolors = None, None, None
-        for line in lines[:30]:
-            match = re.search(r'"(\d+)\s+(\d+)\s+(\d+)\s+(\d+)"', line)
-            if match:
-                width = int(match.group(1))
-                height = int(match.group(2))
-                ncolors = int(match.group(3))
-                break
-        
-        if not width:
-            return None
-        
-        # Parse color map - FIXED REGEX
-        color_dict = {}
-        for line in lines:
-            # Match: "A  c #0000FF " /* "-0.0143" */,
-            match = re.match(r'"(.)\s+c\s+\S+\s+"\s*/\*\s*"([^"]*)"', line)
-            if match:
-                char = match.group(1)
-                value_str = match.group(2).strip()
-                try:
-                    value = float(value_str)
-                    color_dict[char] = value
-                except ValueError:
-                    pass
-        
-        if len(color_dict) == 0:
-            return None
-        
-        # Parse data matrix
-        matrix_data = []
-        reading_data = False
-        
-        for line in lines:
-            if line.strip().startswith('"') and ' c ' not in line and '/*' not in line:
-                reading_data = True
-                
-            if reading_data and line.strip().startswith('"'):
-                match = re.search(r'"([^"]+)"', line)
-                if match:
-                    row_chars = match.group(1)
-                    row_values = [color_dict.get(c, 0.0) for c in row_chars]
-                    
-                    if len(row_values) == width:
-                        matrix_data.append(row_values)
-                    
-                    if len(matrix_data) >= height:
-                        break
-        
-        return np.array(matrix_data) if matrix_data else None
-        
-    except Exception as e:
-        print(f"Error parsing {xpm_file}: {e}")
-        return None
+apply_white_style()
 
 # Systems data
 systems = {
@@ -83,6 +19,16 @@ systems = {
     'D) Maslinic Acid Analogue Complex': 'maslinic_acid_covar.xpm'
 }
 
+def _style_ax(ax, title):
+    """Apply the shared panel title, axis labels, spines and ticks"""
+    ax.set_title(title, fontsize=12, fontweight='normal', pad=10)
+    ax.set_xlabel('Residue Index', fontsize=10)
+    ax.set_ylabel('Residue Index', fontsize=10)
+    for spine in ax.spines.values():
+        spine.set_color('black')
+        spine.set_linewidth(0.8)
+    ax.tick_params(labelsize=9, length=3, width=0.8)
+
 # Create figure
 fig = plt.figure(figsize=(14, 10), facecolor='white')
 
@@ -102,25 +48,30 @@ positions = [
 all_matrices = {}
 for system_name, xpm_file in systems.items():
     if os.path.exists(xpm_file):
-        matrix = parse_xpm_file(xpm_file)
+        matrix = parse_xpm(xpm_file)
         if matrix is not None:
             all_matrices[system_name] = matrix
 
 # Find global percentile-based range for better contrast
 if all_matrices:
-    all_values = np.concatenate([m.flatten() for m in all_matrices.values()])
+    # Percentiles from at most 100k cells per matrix: exact for typical
+    # protein sizes, and bounded memory for very large systems
+    rng = np.random.default_rng(0)
+    samples = np.concatenate([
+        rng.choice(m.ravel(), size=100_000, replace=False) if m.size > 100_000 else m.ravel()
+        for m in all_matrices.values()
+    ])
     
     # Use percentile clipping for better visualization
     # This focuses on the main data distribution, not extreme outliers
-    percentile_min = np.percentile(all_values, 2)
-    percentile_max = np.percentile(all_values, 98)
+    percentile_min, percentile_max = np.percentile(samples, [2, 98])
     
     # Make symmetric around zero
     vmax = max(abs(percentile_min), abs(percentile_max))
     vmin = -vmax
     
-    global_min = all_values.min()
-    global_max = all_values.max()
+    global_min = min(m.min() for m in all_matrices.values())
+    global_max = max(m.max() for m in all_matrices.values())
     
     print(f"Full data range: [{global_min:.4f}, {global_max:.4f}]")
     print(f"98th percentile range: [{percentile_min:.4f}, {percentile_max:.4f}]")
@@ -138,20 +89,7 @@ for idx, (system_name, xpm_file) in enumerate(systems.items()):
             
             # Plot DCCM with enhanced contrast
             im = ax.imshow(dccm_matrix, cmap='RdBu_r', vmin=vmin, vmax=vmax,
-                         aspect='auto', interpolation='nearest')
-            
-            # Clean styling
-            ax.set_title(system_name, fontsize=12, fontweight='normal', pad=10)
-            ax.set_xlabel('Residue Index', fontsize=10)
-            ax.set_ylabel('Residue Index', fontsize=10)
-            
-            # Clean spines
-            for spine in ax.spines.values():
-                spine.set_color('black')
-                spine.set_linewidth(0.8)
-            
-            # Tick parameters
-            ax.tick_params(labelsize=9, length=3, width=0.8)
+                         aspect='auto', interpolation='none')
             
             # Add colorbar with better formatting
             cbar = plt.colorbar(im, ax=ax, pad=0.02)
@@ -169,45 +107,28 @@ for idx, (system_name, xpm_file) in enumerate(systems.items()):
             ax.text(0.5, 0.5, 'Error parsing data', 
                    ha='center', va='center', transform=ax.transAxes,
                    fontsize=10, style='italic', color='gray')
-            ax.set_title(system_name, fontsize=12, fontweight='normal', pad=10)
-            ax.set_xlabel('Residue Index', fontsize=10)
-            ax.set_ylabel('Residue Index', fontsize=10)
-            
-            for spine in ax.spines.values():
-                spine.set_color('black')
-                spine.set_linewidth(0.8)
-            ax.tick_params(labelsize=9, length=3, width=0.8)
         else:
             ax.text(0.5, 0.5, 'File not found', 
                    ha='center', va='center', transform=ax.transAxes,
                    fontsize=10, style='italic', color='gray')
-            ax.set_title(system_name, fontsize=12, fontweight='normal', pad=10)
-            ax.set_xlabel('Residue Index', fontsize=10)
-            ax.set_ylabel('Residue Index', fontsize=10)
-            
-            for spine in ax.spines.values():
-                spine.set_color('black')
-                spine.set_linewidth(0.8)
-            ax.tick_params(labelsize=9, length=3, width=0.8)
             
     except Exception as e:
         print(f"Error processing {system_name}: {e}")
         ax.text(0.5, 0.5, 'Error loading data', 
                ha='center', va='center', transform=ax.transAxes,
                fontsize=10, style='italic', color='gray')
-        ax.set_title(system_name, fontsize=12, fontweight='normal', pad=10)
-        ax.set_xlabel('Residue Index', fontsize=10)
-        ax.set_ylabel('Residue Index', fontsize=10)
-        
-        for spine in ax.spines.values():
-            spine.set_color('black')
-            spine.set_linewidth(0.8)
-        ax.tick_params(labelsize=9, length=3, width=0.8)
+    
+    # Clean styling, applied once whichever branch filled the panel
+    _style_ax(ax, system_name)
 
 # Save with high quality
-plt.savefig('comparative_dccm_clean.png', dpi=300, bbox_inches='tight',
+# Measure the tight bounding box once and reuse it for both formats;
+# the heavy artists are rasterized, so EPS only needs a lower DPI
+fig.set_dpi(300)  # measure text at the PNG resolution
+bbox = fig.get_tightbbox(fig.canvas.get_renderer()).padded(plt.rcParams['savefig.pad_inches'])
+fig.savefig('comparative_dccm_clean.png', dpi=300, bbox_inches=bbox,
             facecolor='white', edgecolor='none')
-plt.savefig('comparative_dccm_clean.eps', format='eps', dpi=300, 
-            bbox_inches='tight', facecolor='white', edgecolor='none')
+fig.savefig('comparative_dccm_clean.eps', format='eps', dpi=150, 
+            bbox_inches=bbox, facecolor='white', edgecolor='none')
 print("\n✓ Saved comparative_dccm_clean.png and comparative_dccm_clean.eps")
 plt.close()
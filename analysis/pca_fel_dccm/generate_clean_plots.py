@@ -4,7 +4,21 @@ Generate all comparative analysis plots with clean spacing
 """
 
 import os
+import io
+import sys
+import runpy
+import traceback
 import subprocess
+import multiprocessing
+from contextlib import redirect_stdout, redirect_stderr
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Import the plotting stack once here; forked workers inherit it instead
+# of each script paying the matplotlib/numpy start-up again
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot
+import numpy
 
 print("="*60)
 print("GENERATING CLEAN COMPARATIVE ANALYSIS PLOTS")
@@ -17,26 +31,74 @@ scripts = [
     'comparative_dccm_clean_titles.py'
 ]
 
-for script in scripts:
-    if os.path.exists(script):
-        print(f"\n🎯 Running {script}...")
+def run_script(script):
+    """Run one analysis script in a new interpreter; returns (script, CompletedProcess or the exception raised)"""
+    print(f"\n🎯 Running {script}...", flush=True)
+    try:
+        return script, subprocess.run(['python3', script], 
+                                      capture_output=True, text=True)
+    except Exception as e:
+        return script, e
+
+def run_script_forked(script):
+    """Run one analysis script as __main__ in this forked worker; returns (script, CompletedProcess)"""
+    print(f"\n🎯 Running {script}...", flush=True)
+    stdout, stderr = io.StringIO(), io.StringIO()
+    returncode = 0
+    with redirect_stdout(stdout), redirect_stderr(stderr):
         try:
-            result = subprocess.run(['python3', script], 
-                                  capture_output=True, text=True)
-            if result.returncode == 0:
-                print(f"✅ {script} completed successfully")
-                if result.stdout:
-                    for line in result.stdout.strip().split('\n'):
-                        if line and not line.startswith('#'):
-                            print(f"   📝 {line}")
-            else:
-                print(f"❌ Error running {script}")
-                if result.stderr:
-                    print(f"   💥 Error: {result.stderr}")
-        except Exception as e:
-            print(f"❌ Exception running {script}: {e}")
-    else:
-        print(f"❌ {script} not found")
+            runpy.run_path(script, run_name='__main__')
+        except SystemExit as e:
+            if isinstance(e.code, int):
+                returncode = e.code
+            elif e.code is not None:
+                print(e.code, file=sys.stderr)
+                returncode = 1
+        except BaseException:
+            traceback.print_exc()
+            returncode = 1
+    return script, subprocess.CompletedProcess(['python3', script], returncode,
+                                               stdout.getvalue(), stderr.getvalue())
+
+def report(script, result):
+    """Print the outcome of one script; returns True if it succeeded"""
+    if isinstance(result, Exception):
+        print(f"❌ Exception running {script}: {result}")
+        return False
+    if result.returncode == 0:
+        print(f"✅ {script} completed successfully")
+        if result.stdout:
+            for line in result.stdout.strip().split('\n'):
+                if line and not line.startswith('#'):
+                    print(f"   📝 {line}")
+        return True
+    print(f"❌ Error running {script} (exit code {result.returncode})")
+    if result.stderr:
+        print(f"   💥 Error: {result.stderr}")
+    return False
+
+# The scripts share no state and write different files, so they run
+# concurrently; each one is reported as soon as it finishes
+found = [script for script in scripts if os.path.exists(script)]
+failed = [script for script in scripts if script not in found]
+for script in failed:
+    print(f"❌ {script} not found")
+if 'fork' in multiprocessing.get_all_start_methods():
+    # One fresh fork per script (maxtasksperchild=1), so rcParams and open
+    # figures never leak from one script into the next
+    with multiprocessing.get_context('fork').Pool(max(len(found), 1), maxtasksperchild=1) as pool:
+        for script, result in pool.imap_unordered(run_script_forked, found, chunksize=1):
+            if not report(script, result):
+                failed.append(script)
+else:
+    with ThreadPoolExecutor(max_workers=max(len(found), 1)) as executor:
+        for future in as_completed([executor.submit(run_script, script) for script in found]):
+            script, result = future.result()
+            if not report(script, result):
+                failed.append(script)
+
+if failed:
+    print(f"\n⚠️  {len(failed)} of {len(scripts)} scripts failed: {', '.join(failed)}")
 
 print("\n" + "="*60)
 print("CLEAN PLOTS GENERATION COMPLETE!")
@@ -44,7 +106,7 @@ print("="*60)
 
 # List all generated files
 output_files = [
-    'comparative_pca_clean.eps',
+    'comparative_pca_clean.pdf',
     'comparative_fels_clean.eps', 
     'comparative_dccm_clean.eps',
     'comparative_pca_clean.png',
@@ -0,0 +1,26 @@
+"""Panel style shared by the PCA/FEL/DCCM plotting scripts"""
+
+import matplotlib.pyplot as plt
+
+# The rcParams seaborn's set_style("white") applies, so the scripts get the
+# same look without importing seaborn
+WHITE_STYLE = {
+    'axes.edgecolor': '.15',
+    'axes.labelcolor': '.15',
+    'text.color': '.15',
+    'xtick.color': '.15',
+    'ytick.color': '.15',
+    'xtick.bottom': False,
+    'ytick.left': False,
+    'axes.axisbelow': True,
+    'grid.color': '.8',
+    'lines.solid_capstyle': 'round',
+    'patch.edgecolor': 'w',
+    'patch.force_edgecolor': True,
+}
+
+def apply_white_style():
+    """Apply the seaborn "white" style with an Arial/Helvetica sans-serif font list"""
+    plt.rcParams.update(WHITE_STYLE)
+    plt.rcParams['font.family'] = 'sans-serif'
+    plt.rcParams['font.sans-serif'] = ['Arial', 'Helvetica', 'DejaVu Sans']
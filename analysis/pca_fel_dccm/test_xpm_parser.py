@@ -3,8 +3,18 @@
 Fixed XPM parsers that handle multiple GROMACS formats
 Replace the parse functions in your scripts with these
 """
+import mmap
 import numpy as np
-import re
+
+def _iter_lines(buf):
+    """Yield (lineno, start, end) for each line of buf, without copying it"""
+    start, lineno = 0, 0
+    while start < len(buf):
+        end = buf.find(b'\n', start)
+        if end < 0:
+            end = len(buf)
+        yield lineno, start, end
+        start, lineno = end + 1, lineno + 1
 
 def parse_xpm_robust(xpm_file):
     """
@@ -12,95 +22,103 @@ def parse_xpm_robust(xpm_file):
     Handles multiple XPM format variations
     """
     try:
-        with open(xpm_file, 'r') as f:
-            lines = f.readlines()
-        
-        # Find matrix dimensions
-        width, height, ncolors = None, None, None
-        for line in lines[:30]:
-            # Format: "width height ncolors chars_per_pixel"
-            match = re.search(r'"(\d+)\s+(\d+)\s+(\d+)\s+(\d+)"', line)
-            if match:
-                width = int(match.group(1))
-                height = int(match.group(2))
-                ncolors = int(match.group(3))
-                print(f"Found dimensions: {width}x{height}, {ncolors} colors")
-                break
-        
-        if not width:
-            print(f"ERROR: Could not find dimensions in {xpm_file}")
-            return None
-        
-        # Parse color map
-        color_dict = {}
-        in_colors = False
-        
-        for line in lines:
-            line_stripped = line.strip()
+        # Map the file instead of reading it: only the header and colour
+        # lines are sliced out as bytes, the data rows are decoded in place.
+        # The map is closed when the block exits, on errors too; the
+        # decoded matrix is a copy, so it outlives the map
+        with open(xpm_file, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            
+            # One pass over the map, shared by the three stages below: GROMACS
+            # writes the header, then ncolors colour lines, then height data rows,
+            # so each stage picks up where the previous one stopped
+            remaining = _iter_lines(buf)
+            
+            # Find matrix dimensions
+            width, height, ncolors = None, None, None
+            for lineno, start, end in remaining:
+                line = buf[start:end]
+                # Format: "width height ncolors chars_per_pixel"
+                fields = line.strip().strip(b'",').split()
+                if len(fields) == 4 and all(field.isdigit() for field in fields):
+                    width, height, ncolors = (int(field) for field in fields[:3])
+                    print(f"Found dimensions: {width}x{height}, {ncolors} colors")
+                    break
+                if lineno >= 29:
+                    break
+            
+            if not width:
+                print(f"ERROR: Could not find dimensions in {xpm_file}")
+                return None
             
-            # Start reading colors after static section
-            if '"' in line and ' c ' in line and 'static' not in line:
-                in_colors = True
+            # Parse color map
+            # Format: "X c #hexcolor /* "value" */" - the value is the first
+            # quoted string after the /*, with or without a quote before it
+            color_dict = {}
+            n_color_lines = 0
             
-            # Parse color definitions
-            # Format: "X c #hexcolor /* "value" */"
-            if in_colors and '"' in line and ' c ' in line:
-                # Try to extract character and value
-                match = re.match(r'"(.)\s+c\s+\S+\s*/\*\s*"([^"]*)"', line_stripped)
-                if match:
-                    char = match.group(1)
-                    value_str = match.group(2).strip()
+            for lineno, start, end in remaining:
+                line = buf[start:end]
+                line_stripped = line.strip()
+                if not line_stripped.startswith(b'"'):
+                    continue
+                
+                comment = line_stripped.find(b'/*')
+                value_start = line_stripped.find(b'"', comment) + 1 if comment >= 0 else 0
+                value_end = line_stripped.find(b'"', value_start) if value_start else -1
+                if value_end >= 0:
                     try:
-                        value = float(value_str)
-                        color_dict[char] = value
+                        color_dict[line_stripped[1]] = float(line_stripped[value_start:value_end])
                     except ValueError:
                         pass
                 
-                # Stop reading colors when we have enough
-                if len(color_dict) >= ncolors:
+                # Stop reading colors when we have them all
+                n_color_lines += 1
+                if n_color_lines >= ncolors:
+                    break
+            
+            print(f"Parsed {len(color_dict)} colors from {xpm_file}")
+            
+            if len(color_dict) == 0:
+                print(f"ERROR: No color map found in {xpm_file}")
+                return None
+            
+            # Parse data rows through a 256-entry lookup table indexed by byte
+            # value, so the whole matrix is decoded by one numpy gather instead
+            # of a dict lookup per character; unknown characters stay 0.0
+            lut = np.zeros(256, dtype=np.float64)
+            for char, value in color_dict.items():
+                lut[char] = value
+            row_offsets = []
+            
+            for lineno, start, end in remaining:
+                # Read data rows: the character sequence between the quotes,
+                # located in place in the map; only its offset is kept
+                first = buf.find(b'"', start, end)
+                if first < 0 or buf[start:first].strip():
+                    continue
+                last = buf.find(b'"', first + 1, end)
+                
+                if last - first - 1 == width:
+                    row_offsets.append(first + 1)
+                
+                # Stop when we have all rows
+                if len(row_offsets) >= height:
                     break
-        
-        print(f"Parsed {len(color_dict)} colors from {xpm_file}")
-        
-        if len(color_dict) == 0:
-            print(f"ERROR: No color map found in {xpm_file}")
-            return None
-        
-        # Parse data rows
-        matrix_data = []
-        in_data = False
-        
-        for line in lines:
-            # Data rows start after colors and comments
-            if not in_data and len(color_dict) > 0 and line.strip().startswith('"'):
-                # Check if this is a data row (not a color definition)
-                if ' c ' not in line:
-                    in_data = True
             
-            # Read data rows
-            if in_data and line.strip().startswith('"'):
-                # Extract character sequence between quotes
-                match = re.search(r'"([^"]+)"', line)
-                if match:
-                    row_chars = match.group(1)
-                    # Convert characters to values
-                    row_values = [color_dict.get(c, 0.0) for c in row_chars]
-                    
-                    if len(row_values) == width:
-                        matrix_data.append(row_values)
-                    
-                    # Stop when we have all rows
-                    if len(matrix_data) >= height:
-                        break
-        
-        if len(matrix_data) == 0:
-            print(f"ERROR: No matrix data found in {xpm_file}")
-            return None
-        
-        matrix = np.array(matrix_data)
-        print(f"Successfully parsed {xpm_file}: {matrix.shape}, range [{matrix.min():.3f}, {matrix.max():.3f}]")
-        return matrix
-        
+            if not row_offsets:
+                print(f"ERROR: No matrix data found in {xpm_file}")
+                return None
+            
+            # Decode every row in one gather over the mapped bytes: row start
+            # offsets plus column positions index the map, the bytes index the LUT
+            # (the frombuffer view is a temporary, so no export of the map
+            # outlives this statement and blocks closing it)
+            rows = np.array(row_offsets)[:, None] + np.arange(width)
+            matrix = lut[np.frombuffer(buf, dtype=np.uint8)[rows]]
+            print(f"Successfully parsed {xpm_file}: {matrix.shape}, range [{matrix.min():.3f}, {matrix.max():.3f}]")
+            return matrix
+            
     except Exception as e:
         print(f"ERROR parsing {xpm_file}: {e}")
         import traceback
@@ -2,8 +2,19 @@
 """
 Working XPM parser for your GROMACS format
 """
+import itertools
+import mmap
 import numpy as np
-import re
+
+def _iter_lines(buf):
+    """Yield (lineno, start, end) for each line of buf, without copying it"""
+    start, lineno = 0, 0
+    while start < len(buf):
+        end = buf.find(b'\n', start)
+        if end < 0:
+            end = len(buf)
+        yield lineno, start, end
+        start, lineno = end + 1, lineno + 1
 
 def parse_xpm_gromacs(xpm_file):
     """
@@ -11,82 +22,103 @@ def parse_xpm_gromacs(xpm_file):
     "A  c #0000FF " /* "-0.0143" */,
     """
     try:
-        with open(xpm_file, 'r') as f:
-            lines = f.readlines()
-        
-        # Find matrix dimensions
-        width, height, ncolors = None, None, None
-        for line in lines[:30]:
-            match = re.search(r'"(\d+)\s+(\d+)\s+(\d+)\s+(\d+)"', line)
-            if match:
-                width = int(match.group(1))
-                height = int(match.group(2))
-                ncolors = int(match.group(3))
-                print(f"Dimensions: {width}x{height}, {ncolors} colors")
-                break
-        
-        if not width:
-            print(f"ERROR: No dimensions found")
-            return None
-        
-        # Parse color map with the correct format
-        color_dict = {}
-        
-        for line in lines:
-            # Match: "A  c #0000FF " /* "-0.0143" */,
-            # The key part is there's a SPACE before /*
-            match = re.match(r'"(.)\s+c\s+\S+\s+"\s*/\*\s*"([^"]*)"', line)
-            if match:
-                char = match.group(1)
-                value_str = match.group(2).strip()
-                try:
-                    value = float(value_str)
-                    color_dict[char] = value
-                except ValueError:
-                    pass
-        
-        print(f"Parsed {len(color_dict)} colors")
-        
-        if len(color_dict) == 0:
-            print("ERROR: No colors parsed")
-            # Show a sample line for debugging
-            for line in lines[10:20]:
-                if ' c ' in line and '/*' in line:
-                    print(f"Sample line: {line.strip()}")
+        # Map the file instead of reading it: only the header and colour
+        # lines are sliced out as bytes, the data rows are decoded in place.
+        # The map is closed when the block exits, on errors too; the
+        # decoded matrix is a copy, so it outlives the map
+        with open(xpm_file, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            
+            # One pass over the map, shared by the three stages below: GROMACS
+            # writes the header, then ncolors colour lines, then height data rows
+            remaining = _iter_lines(buf)
+            
+            # Find matrix dimensions
+            width, height, ncolors = None, None, None
+            for lineno, start, end in remaining:
+                line = buf[start:end]
+                fields = line.strip().strip(b'",').split()
+                if len(fields) == 4 and all(field.isdigit() for field in fields):
+                    width, height, ncolors = (int(field) for field in fields[:3])
+                    print(f"Dimensions: {width}x{height}, {ncolors} colors")
+                    break
+                if lineno >= 29:
                     break
-            return None
-        
-        # Parse data matrix
-        matrix_data = []
-        reading_data = False
-        
-        for line in lines:
-            # Data rows start after color definitions
-            # They look like: "FFFFFFGGGHHHIII...",
-            if line.strip().startswith('"') and ' c ' not in line and '/*' not in line:
-                reading_data = True
+            
+            if not width:
+                print(f"ERROR: No dimensions found")
+                return None
+            
+            # Parse color map with the correct format
+            color_dict = {}
+            n_color_lines = 0
+            
+            for lineno, start, end in remaining:
+                line = buf[start:end]
+                # Match: "A  c #0000FF " /* "-0.0143" */,
+                # The value is the quoted string after the /*
+                if not line.startswith(b'"'):
+                    continue
+                comment = line.find(b'/*')
+                value_start = line.find(b'"', comment) + 1 if comment >= 0 else 0
+                value_end = line.find(b'"', value_start) if value_start else -1
+                if value_end >= 0:
+                    try:
+                        color_dict[line[1]] = float(line[value_start:value_end])
+                    except ValueError:
+                        pass
                 
-            if reading_data and line.strip().startswith('"'):
-                # Extract characters between quotes
-                match = re.search(r'"([^"]+)"', line)
-                if match:
-                    row_chars = match.group(1)
-                    row_values = [color_dict.get(c, 0.0) for c in row_chars]
-                    
-                    if len(row_values) == width:
-                        matrix_data.append(row_values)
-                    
-                    if len(matrix_data) >= height:
+                n_color_lines += 1
+                if n_color_lines >= ncolors:
+                    break
+            
+            print(f"Parsed {len(color_dict)} colors")
+            
+            if len(color_dict) == 0:
+                print("ERROR: No colors parsed")
+                # Show a sample line for debugging
+                for lineno, start, end in itertools.islice(_iter_lines(buf), 10, 20):
+                    line = buf[start:end]
+                    if b' c ' in line and b'/*' in line:
+                        print(f"Sample line: {line.strip().decode('latin-1')}")
                         break
-        
-        if len(matrix_data) == 0:
-            print("ERROR: No data rows found")
-            return None
-        
-        matrix = np.array(matrix_data)
-        print(f"✅ Matrix: {matrix.shape}, range [{matrix.min():.4f}, {matrix.max():.4f}]")
-        return matrix
-        
+                return None
+            
+            # Parse data matrix through a 256-entry lookup table indexed by byte
+            # value, so the whole matrix is decoded by one numpy gather instead
+            # of a dict lookup per character; unknown characters stay 0.0
+            lut = np.zeros(256, dtype=np.float64)
+            for char, value in color_dict.items():
+                lut[char] = value
+            row_offsets = []
+            
+            for lineno, start, end in remaining:
+                # Data rows look like: "FFFFFFGGGHHHIII...", located in place
+                # in the map; only the offset is kept for the gather below
+                first = buf.find(b'"', start, end)
+                if first < 0 or buf[start:first].strip():
+                    continue
+                last = buf.find(b'"', first + 1, end)
+                
+                if last - first - 1 == width:
+                    row_offsets.append(first + 1)
+                
+                if len(row_offsets) >= height:
+                    break
+            
+            if not row_offsets:
+                print("ERROR: No data rows found")
+                return None
+            
+            # Decode every row in one gather over the mapped bytes: row start
+            # offsets plus column positions index the map, the bytes index the LUT
+            # (the frombuffer view is a temporary, so no export of the map
+            # outlives this statement and blocks closing it)
+            rows = np.array(row_offsets)[:, None] + np.arange(width)
+            matrix = lut[np.frombuffer(buf, dtype=np.uint8)[rows]]
+            print(f"✅ Matrix: {matrix.shape}, range [{matrix.min():.4f}, {matrix.max():.4f}]")
+            return matrix
+            
     except Exception as e:
         print(f"ERROR: {e}")
         import traceback
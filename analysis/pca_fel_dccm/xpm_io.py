@@ -0,0 +1,133 @@
+"""GROMACS XPM reading shared by the PCA/FEL/DCCM plotting scripts"""
+
+import numpy as np
+import os
+import re
+
+# XPM patterns, compiled once and matched against raw bytes
+XPM_DIM_RE = re.compile(rb'"(\d+)\s+(\d+)\s+(\d+)\s+(\d+)"')
+# Match: "A  c #0000FF " /* "-0.0143" */,
+XPM_COLOR_RE = re.compile(rb'"(.)\s+c\s+\S+\s+"\s*/\*\s*"([^"]*)"')
+XPM_ROW_RE = re.compile(rb'"([^"]+)"')
+
+def parse_xpm(xpm_file):
+    """Parse a GROMACS XPM file (covariance or probability map) into a float matrix"""
+    try:
+        width = height = None
+        color_dict = {}
+        rows = []
+        # Single pass: 0 = header (dimensions), 1 = color map, 2 = data rows
+        state = 0
+        
+        with open(xpm_file, 'rb') as f:
+            for lineno, line in enumerate(f):
+                if state == 0:
+                    match = XPM_DIM_RE.search(line)
+                    if match:
+                        width = int(match.group(1))
+                        height = int(match.group(2))
+                        state = 1
+                    elif lineno >= 29:
+                        return None
+                    continue
+                
+                if state == 1:
+                    match = XPM_COLOR_RE.match(line)
+                    if match:
+                        try:
+                            color_dict[match.group(1)[0]] = float(match.group(2).strip())
+                        except ValueError:
+                            pass
+                        continue
+                    
+                    if not line.strip().startswith(b'"') or b' c ' in line or b'/*' in line:
+                        continue
+                    
+                    if not color_dict:
+                        return None
+                    
+                    state = 2
+                
+                if line.strip().startswith(b'"'):
+                    match = XPM_ROW_RE.search(line)
+                    if match:
+                        row_chars = match.group(1)
+                        
+                        if len(row_chars) == width:
+                            rows.append(row_chars)
+                        
+                        if len(rows) >= height:
+                            break
+        
+        if not rows:
+            return None
+        
+        # Byte-indexed lookup table: decode the whole matrix in one C-level
+        # gather over the concatenated rows instead of per row or per char.
+        # XPM legends carry ~4 significant digits, so float32 loses nothing
+        lut = np.zeros(256, dtype=np.float32)
+        for char, value in color_dict.items():
+            lut[char] = value
+        
+        data = np.frombuffer(b''.join(rows), dtype=np.uint8).reshape(len(rows), width)
+        return lut[data]
+        
+    except Exception as e:
+        print(f"Error parsing {xpm_file}: {e}")
+        return None
+
+def parse_xpm_cached(xpm_file):
+    """parse_xpm, cached next to the source as '<file>.npy' while newer than the .xpm"""
+    cache_file = xpm_file + '.npy'
+    try:
+        if os.path.getmtime(cache_file) >= os.path.getmtime(xpm_file):
+            cached = np.load(cache_file, mmap_mode='r')
+            if cached.dtype == np.float32:  # older caches were float64
+                return cached
+    except (OSError, ValueError):
+        pass
+    
+    matrix = parse_xpm(xpm_file)
+    if matrix is not None:
+        try:
+            np.save(cache_file, matrix)
+        except OSError:
+            pass
+    return matrix
+
+def prob_to_fel(prob_matrix):
+    """Convert probability matrix to Free Energy Landscape"""
+    if prob_matrix is None:
+        return None
+        
+    kT = 2.494  # kJ/mol at 300K
+    
+    prob_matrix = np.asarray(prob_matrix, dtype=np.float32)
+    
+    # Avoid log(0) issues: floor empty bins at a tenth of the smallest
+    # populated one. np.maximum gives a fresh array (cached maps are
+    # read-only memmaps), so the rest can work in place on it
+    min_prob = prob_matrix[prob_matrix > 0].min()
+    free_energy = np.maximum(prob_matrix, min_prob * 0.1)
+    
+    # Convert to free energy; every entry is now > 0, so the log is finite
+    np.log(free_energy, out=free_energy)
+    free_energy *= -kT
+    free_energy -= free_energy.min()
+    
+    return free_energy
+
+def fel_contour_data(fel_matrix, max_cells=50_000):
+    """Arguments for ax.contour; large landscapes are contoured at 1/4 resolution.
+    
+    The overlay only spans a few hundred screen pixels, so the coarse grid
+    looks the same; x/y keep it on the full-resolution pixel centres.
+    """
+    if fel_matrix.size <= max_cells:
+        return (fel_matrix,)
+    # Imported here so the DCCM scripts using this module do not load scipy
+    from scipy.ndimage import zoom
+    fel_small = zoom(fel_matrix, 0.25, order=1)
+    ys = np.linspace(0, fel_matrix.shape[0] - 1, fel_small.shape[0])
+    xs = np.linspace(0, fel_matrix.shape[1] - 1, fel_small.shape[1])
+    return xs, ys, fel_small
@@ -28,17 +28,19 @@ dpi = 900
 border_width = 8  # Width of grid lines/borders
 border_color = 'black'  # Color of grid lines
 
-# Load all images
+# Read the image sizes; Image.open only parses the header, so nothing is
+# decoded here. Each image is decoded in turn while compositing below
 print("Loading images...")
-images = []
+image_paths, image_sizes = [], []
 for filename in image_filenames:
     filepath = os.path.join(input_dir, filename)
-    img = Image.open(filepath)
-    images.append(img)
-    print(f"Loaded: {filename} - Size: {img.size}")
+    with Image.open(filepath) as img:
+        image_sizes.append(img.size)
+    image_paths.append(filepath)
+    print(f"Loaded: {filename} - Size: {image_sizes[-1]}")
 
 # Get dimensions (assuming all images are same size)
-img_width, img_height = images[0].size
+img_width, img_height = image_sizes[0]
 print(f"\nIndividual image size: {img_width}x{img_height} pixels")
 
 # Calculate composite dimensions
@@ -84,17 +86,24 @@ positions = [
     (padding + img_width + padding, padding + img_height + label_space + padding)  # Bottom-right
 ]
 
+# Measure every label once up front; the font and labels do not change
+label_bboxes = [draw.textbbox((0, 0), label, font=font) for label in labels]
+
 print("\nCompositing images and adding labels...")
-for i, (img, pos, label) in enumerate(zip(images, positions, labels)):
-    # Paste image
-    composite.paste(img, pos)
+for i, (filepath, pos, label) in enumerate(zip(image_paths, positions, labels)):
+    # Paste image, then close it so only one decoded image is held
+    # alongside the canvas at a time
+    with Image.open(filepath) as img:
+        if img.mode != composite.mode:
+            img = img.convert(composite.mode)
+        composite.paste(img, pos)
     
     # Calculate label position (centered below image)
     label_x = pos[0] + img_width // 2
     label_y = pos[1] + img_height + 80  # 80 pixels below image
     
-    # Get text bounding box for centering
-    bbox = draw.textbbox((0, 0), label, font=font)
+    # Text bounding box for centering
+    bbox = label_bboxes[i]
     text_width = bbox[2] - bbox[0]
     text_height = bbox[3] - bbox[1]
     
@@ -124,7 +133,7 @@ print(f"✓ Grid borders added")
 
 # Save with DPI information
 print(f"\nSaving composite image: {output_filename}")
-composite.save(output_filename, dpi=(dpi, dpi), quality=100)
+composite.save(output_filename, dpi=(dpi, dpi), compress_level=1)  # fast zlib; PNG ignores quality
 
 print(f"✓ Successfully created composite image!")
 print(f"  Output: {output_filename}")
@@ -30,17 +30,19 @@ BORDER_WIDTH = 8  # Width of border frames around each image
 BORDER_COLOR = (100, 100, 100)  # Dark gray color for borders
 
 try:
-    # Load all images
+    # Read the image sizes; Image.open only parses the header, so nothing is
+    # decoded here. Each image is decoded in turn while composing below
     print("Loading images...")
-    images = []
+    image_paths, image_sizes = [], []
     for filename in image_files:
         filepath = os.path.join(input_dir, filename)
-        img = Image.open(filepath)
-        images.append(img)
-        print(f"Loaded: {filename} - Size: {img.size}")
+        with Image.open(filepath) as img:
+            image_sizes.append(img.size)
+        image_paths.append(filepath)
+        print(f"Loaded: {filename} - Size: {image_sizes[-1]}")
     
     # Get dimensions (assuming all images are same size)
-    img_width, img_height = images[0].size
+    img_width, img_height = image_sizes[0]
     
     # Try to load a good font
     try:
@@ -75,8 +77,11 @@ try:
         (PADDING * 2 + img_width, PADDING * 2 + img_height + LABEL_SPACING)  # Bottom-right
     ]
     
+    # Measure every label once up front; the font and labels do not change
+    label_bboxes = [draw.textbbox((0, 0), label, font=font) for label in labels]
+    
     print("\nComposing grid...")
-    for i, (img, pos, label) in enumerate(zip(images, positions, labels)):
+    for i, (filepath, pos, label) in enumerate(zip(image_paths, positions, labels)):
         # Draw border frame around image
         border_box = [
             pos[0] - BORDER_WIDTH,
@@ -86,14 +91,18 @@ try:
         ]
         draw.rectangle(border_box, outline=BORDER_COLOR, width=BORDER_WIDTH)
         
-        # Paste image
-        canvas.paste(img, pos)
+        # Paste image, then close it so only one decoded image is held
+        # alongside the canvas at a time
+        with Image.open(filepath) as img:
+            if img.mode != canvas.mode:
+                img = img.convert(canvas.mode)
+            canvas.paste(img, pos)
         
         # Calculate label position (centered below image)
         label_y = pos[1] + img_height + (LABEL_SPACING // 4)
         
-        # Get text bounding box for centering
-        bbox = draw.textbbox((0, 0), label, font=font)
+        # Text bounding box for centering
+        bbox = label_bboxes[i]
         text_width = bbox[2] - bbox[0]
         
         # Center text below image
@@ -105,7 +114,7 @@ try:
     
     # Save with DPI information
     print(f"\nSaving composite image to: {output_filename}")
-    canvas.save(output_filename, dpi=(DPI, DPI), quality=100)
+    canvas.save(output_filename, dpi=(DPI, DPI), compress_level=1)  # fast zlib; PNG ignores quality
     
     print(f"✓ Success! Composite image saved.")
     print(f"  Final dimensions: {canvas_width} x {canvas_height} pixels")
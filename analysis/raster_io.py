@@ -0,0 +1,87 @@
+import io
+import numpy as np
+import matplotlib
+import matplotlib.image
+
+# tifffile can write the TIFF tile by tile; Pillow is used without it
+try:
+    import tifffile
+except ImportError:
+    tifffile = None
+
+TIFF_TILE = 256
+
+class _RGBACapture(io.RawIOBase):
+    """Write target for savefig(format='rgba') that keeps the render buffer as an array"""
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        # The Agg backend hands over its (height, width, 4) buffer in a single
+        # write, so the raster size comes straight from the renderer
+        self.rgba = np.array(memoryview(data), dtype=np.uint8)
+        return self.rgba.nbytes
+
+def render_rgba(fig, dpi, **savefig_kwargs):
+    """
+    Renders the figure once at the given DPI, cropped like bbox_inches='tight'.
+
+    Returns an (h, w, 4) uint8 array for the PNG and TIFF encoders.
+    """
+    screen_dpi = fig.dpi
+    fig.set_dpi(dpi)  # measure text at the raster resolution
+    try:
+        bbox = fig.get_tightbbox(fig.canvas.get_renderer()).padded(
+            matplotlib.rcParams['savefig.pad_inches'])
+        capture = _RGBACapture()
+        fig.savefig(capture, format='rgba', dpi=dpi, bbox_inches=bbox, **savefig_kwargs)
+    finally:
+        fig.set_dpi(screen_dpi)
+    return capture.rgba
+
+def iter_tiles(image, tile=TIFF_TILE):
+    """Yield an (h, w, c) array as row-major tile x tile blocks (edge tiles padded)"""
+    height, width = image.shape[:2]
+    for y in range(0, height, tile):
+        for x in range(0, width, tile):
+            block = image[y:y + tile, x:x + tile]
+            if block.shape[:2] != (tile, tile):
+                padded = np.zeros((tile, tile) + image.shape[2:], dtype=image.dtype)
+                padded[:block.shape[0], :block.shape[1]] = block
+                block = padded
+            yield block
+
+def save_png(filename, rgba, dpi):
+    """Writes a PNG of an (h, w, 4) uint8 array"""
+    matplotlib.image.imsave(filename, rgba, dpi=dpi,
+                            pil_kwargs={'compress_level': 1})  # fast zlib, ~2x the file size
+
+def save_tiff(filename, rgba, dpi):
+    """Writes a lossless TIFF of an (h, w, 4) uint8 array"""
+    if tifffile is not None:
+        # Stream 256x256 tiles straight out of the render buffer, so no
+        # second full-size copy is made for the encoder
+        tifffile.imwrite(filename, iter_tiles(rgba),
+                         shape=rgba.shape, dtype='uint8',
+                         tile=(TIFF_TILE, TIFF_TILE), photometric='rgb',
+                         extrasamples=['unassalpha'], compression='zlib',
+                         resolution=(dpi, dpi), resolutionunit='INCH')
+    else:
+        matplotlib.image.imsave(filename, rgba, dpi=dpi, format='tiff',
+                                pil_kwargs={'compression': 'tiff_lzw'})  # uncompressed is hundreds of MB
+
+def save_png_tiff(rgba, base_name, dpi, executor=None):
+    """
+    Writes '<base_name>.png' and '<base_name>.tiff' from one rendered buffer.
+
+    With an executor both encodes are submitted to it and their futures are
+    returned (Pillow and zlib release the GIL while they compress);
+    otherwise the files are written before returning.
+    """
+    saves = [(save_png, f'{base_name}.png'), (save_tiff, f'{base_name}.tiff')]
+    if executor is None:
+        for save, filename in saves:
+            save(filename, rgba, dpi)
+        return []
+    return [executor.submit(save, filename, rgba, dpi) for save, filename in saves]
@@ -1,78 +1,85 @@
-import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
-from io import StringIO
+import os
 import sys
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+# raster_io.py (shared PNG/TIFF writer) lives one directory up
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from raster_io import render_rgba, save_png_tiff
+
+# Traces longer than this are strided before plotting: a subplot is only a
+# few thousand pixels wide even at 900 DPI, so further points add render and
+# file-size cost without visible detail
+MAX_PLOT_POINTS = 10000
 
 def load_xvg_data(filename):
     """
     Loads data from a GROMACS .xvg file.
     
     Skips lines starting with '@', '#', or '&'.
-    Returns a pandas DataFrame with columns ['Time (ns)', 'RMSD (nm)'].
-    Returns an empty DataFrame if the file is not found or is empty.
+    Returns an (n, 2) array of [time (ns), RMSD (nm)] rows.
+    Returns an empty (0, 2) array if the file is not found or is empty.
     """
-    filtered_lines = []
+    # Reuse the parsed array cached next to the source as '<file>.npy' while
+    # it is newer than the .xvg
+    cache_file = filename + '.npy'
     try:
-        with open(filename, 'r') as f:
-            for line in f:
-                # Skip header/comment/special lines
-                if not line.strip().startswith(('@', '#', '&')):
-                    filtered_lines.append(line)
+        if os.path.getmtime(cache_file) >= os.path.getmtime(filename):
+            return np.load(cache_file)
+    except (OSError, ValueError):
+        pass
+
+    try:
+        # loadtxt drops the '@'/'#'/'&' lines and parses the two columns in C
+        with warnings.catch_warnings():
+            warnings.simplefilter(action='ignore', category=UserWarning)  # "input contained no data"
+            data = np.loadtxt(filename, comments=['@', '#', '&'], usecols=(0, 1),
+                              dtype=np.float64, ndmin=2)
     except FileNotFoundError:
         print(f"Warning: File not found: {filename}. Skipping this plot.", file=sys.stderr)
-        return pd.DataFrame(columns=['Time (ns)', 'RMSD (nm)'])
+        return np.empty((0, 2))
     except Exception as e:
-        print(f"Error reading {filename}: {e}", file=sys.stderr)
-        return pd.DataFrame(columns=['Time (ns)', 'RMSD (nm)'])
+        print(f"Error parsing data from {filename}: {e}", file=sys.stderr)
+        return np.empty((0, 2))
 
-    if not filtered_lines:
+    if not data.size:
         print(f"Warning: No data found in {filename} after filtering.", file=sys.stderr)
-        return pd.DataFrame(columns=['Time (ns)', 'RMSD (nm)'])
+        return data
 
     try:
-        # Use StringIO to read the list of strings as if it were a file
-        data_io = StringIO("".join(filtered_lines))
-        
-        # Suppress the FutureWarning from pandas
-        with warnings.catch_warnings():
-            warnings.simplefilter(action='ignore', category=FutureWarning)
-            df = pd.read_csv(
-                data_io,
-                sep='\s+',  # Use sep='\s+' instead of delim_whitespace=True
-                header=None,
-                names=['Time (ns)', 'RMSD (nm)'],
-                dtype={'Time (ns)': float, 'RMSD (nm)': float},
-                engine='python' # Use python engine for more robust sep handling
-            )
-        return df
-    except Exception as e:
-        print(f"Error parsing data from {filename}: {e}", file=sys.stderr)
-        return pd.DataFrame(columns=['Time (ns)', 'RMSD (nm)'])
+        np.save(cache_file, data)
+    except OSError:
+        pass
+    return data
 
-def plot_rmsd_on_ax(ax, backbone_file, ligand_file, title, backbone_color='blue', ligand_color='red'):
+def thin_trace(trace, max_points=MAX_PLOT_POINTS):
+    """Stride an (n, 2) trace down to about max_points rows for plotting"""
+    stride = max(1, len(trace) // max_points)
+    return trace[::stride]
+
+def plot_rmsd_on_ax(ax, backbone, ligand, title, backbone_color='blue', ligand_color='red'):
     """
     Plots backbone and ligand RMSD data on a given matplotlib axes object.
     
     Args:
         ax (matplotlib.axes.Axes): The subplot axes to plot on.
-        backbone_file (str): Filename for the backbone RMSD .xvg file.
-        ligand_file (str): Filename for the ligand RMSD .xvg file.
+        backbone (numpy.ndarray): Backbone RMSD trace from load_xvg_data.
+        ligand (numpy.ndarray): Ligand RMSD trace from load_xvg_data.
         title (str): The title for this subplot.
         backbone_color (str): Matplotlib color for the backbone plot.
         ligand_color (str): Matplotlib color for the ligand plot.
     """
-    # Load data
-    df_backbone = load_xvg_data(backbone_file)
-    df_ligand = load_xvg_data(ligand_file)
+    backbone, ligand = thin_trace(backbone), thin_trace(ligand)
 
-    # Plot data if DataFrames are not empty
-    if not df_backbone.empty:
-        ax.plot(df_backbone['Time (ns)'], df_backbone['RMSD (nm)'], 
+    # Plot data if the arrays are not empty
+    if backbone.size:
+        ax.plot(backbone[:, 0], backbone[:, 1], 
                 label='Backbone', color=backbone_color, linewidth=1.5)
     
-    if not df_ligand.empty:
-        ax.plot(df_ligand['Time (ns)'], df_ligand['RMSD (nm)'], 
+    if ligand.size:
+        ax.plot(ligand[:, 0], ligand[:, 1], 
                 label='Ligand', color=ligand_color, linewidth=1.5)
 
     # Set subplot titles and labels
@@ -84,7 +91,7 @@ def plot_rmsd_on_ax(ax, backbone_file, ligand_file, title, backbone_color='blue'
     ax.set_facecolor('white')
     
     # Add legend and grid
-    if not df_backbone.empty or not df_ligand.empty:
+    if backbone.size or ligand.size:
         ax.legend(facecolor='white', edgecolor='black')
     ax.grid(True, linestyle='--', alpha=0.6, color='gray')
 
@@ -96,15 +103,34 @@ if __name__ == "__main__":
     plt.rcParams['axes.facecolor'] = 'white'
     plt.rcParams['savefig.facecolor'] = 'white'
     
+    # Reproducible PDF/SVG output: no creation dates (metadata below) and a
+    # fixed salt for the SVG element ids, so unchanged input saves identically
+    plt.rcParams['svg.hashsalt'] = 'rmsd'
+    
     # Create a 2x2 subplot grid
     # fig is the entire figure, axes is a 2D array of the 4 subplots
     fig, axes = plt.subplots(nrows=2, ncols=2, figsize=(16, 12))
 
+    # Load the eight traces up front; the reads are independent, so a
+    # thread pool overlaps their file I/O
+    xvg_files = [
+        'Control_rmsd_backbone_corrected.xvg',
+        'Control_rmsd_ligand_corrected.xvg',
+        'Hedragenin_rmsd_backbone_corrected.xvg',
+        'Hedragenin_rmsd_ligand_corrected.xvg',
+        'Lupeol_rmsd_backbone_corrected.xvg',
+        'Lupeol_rmsd_ligand_corrected.xvg',
+        'Maslinic_Acid_rmsd_backbone_corrected.xvg',
+        'Maslinic_Acid_rmsd_ligand_corrected.xvg',
+    ]
+    with ThreadPoolExecutor(max_workers=len(xvg_files)) as executor:
+        traces = dict(zip(xvg_files, executor.map(load_xvg_data, xvg_files)))
+
     # --- Plot 1 (Top-Left) ---
     # Using a dark blue/bright red pair for maximum contrast
     plot_rmsd_on_ax(axes[0, 0], 
-                    backbone_file='Control_rmsd_backbone_corrected.xvg', 
-                    ligand_file='Control_rmsd_ligand_corrected.xvg', 
+                    backbone=traces['Control_rmsd_backbone_corrected.xvg'], 
+                    ligand=traces['Control_rmsd_ligand_corrected.xvg'], 
                     title='A) Control Complex',
                     backbone_color='#1e3a8a',  # Dark Blue
                     ligand_color='#dc2626')  # Bright Red
@@ -112,8 +138,8 @@ if __name__ == "__main__":
     # --- Plot 2 (Top-Right) ---
     # Using a dark green/bright orange pair
     plot_rmsd_on_ax(axes[0, 1], 
-                    backbone_file='Hedragenin_rmsd_backbone_corrected.xvg', 
-                    ligand_file='Hedragenin_rmsd_ligand_corrected.xvg', 
+                    backbone=traces['Hedragenin_rmsd_backbone_corrected.xvg'], 
+                    ligand=traces['Hedragenin_rmsd_ligand_corrected.xvg'], 
                     title='B) Hedragenin Analogue Complex',
                     backbone_color='#15803d',  # Dark Green
                     ligand_color='#f97316')  # Bright Orange
@@ -121,8 +147,8 @@ if __name__ == "__main__":
     # --- Plot 3 (Bottom-Left) ---
     # Using a dark purple/bright cyan pair
     plot_rmsd_on_ax(axes[1, 0], 
-                    backbone_file='Lupeol_rmsd_backbone_corrected.xvg', 
-                    ligand_file='Lupeol_rmsd_ligand_corrected.xvg', 
+                    backbone=traces['Lupeol_rmsd_backbone_corrected.xvg'], 
+                    ligand=traces['Lupeol_rmsd_ligand_corrected.xvg'], 
                     title='C) Lupeol Analogue Complex',
                     backbone_color='#7c3aed',  # Bright Purple
                     ligand_color='#06b6d4')  # Bright Cyan
@@ -130,8 +156,8 @@ if __name__ == "__main__":
     # --- Plot 4 (Bottom-Right) ---
     # Using a dark brown/bright magenta pair
     plot_rmsd_on_ax(axes[1, 1], 
-                    backbone_file='Maslinic_Acid_rmsd_backbone_corrected.xvg', 
-                    ligand_file='Maslinic_Acid_rmsd_ligand_corrected.xvg', 
+                    backbone=traces['Maslinic_Acid_rmsd_backbone_corrected.xvg'], 
+                    ligand=traces['Maslinic_Acid_rmsd_ligand_corrected.xvg'], 
                     title='D) Maslinic Acid Analogue Complex',
                     backbone_color='#92400e',  # Dark Brown
                     ligand_color='#ec4899')  # Bright Pink
@@ -148,21 +174,34 @@ if __name__ == "__main__":
     
     # Save in multiple formats with white background (explicit in every save)
     OUTPUT_FILENAME = 'rmsd_subplot_comparison_final_white_bg'
-    plt.savefig(f'{OUTPUT_FILENAME}.png', dpi=900, facecolor='white', 
-                edgecolor='white', bbox_inches='tight')
-    plt.savefig(f'{OUTPUT_FILENAME}.tiff', dpi=900, facecolor='white', 
-                edgecolor='white', bbox_inches='tight')
-    plt.savefig(f'{OUTPUT_FILENAME}.eps', format='eps', dpi=900, facecolor='white', 
-                edgecolor='white', bbox_inches='tight')
-    plt.savefig(f'{OUTPUT_FILENAME}.pdf', format='pdf', facecolor='white', 
-                edgecolor='white', bbox_inches='tight')
-    plt.savefig(f'{OUTPUT_FILENAME}.svg', format='svg', facecolor='white', 
+    # Rasterize once at 900 DPI; the PNG and TIFF are both encoded from this
+    # RGBA buffer instead of rendering the figure again for each
+    rgba = render_rgba(fig, 900, facecolor='white', edgecolor='white')
+    # Encode them on worker threads while the vector formats are written below
+    encoder = ThreadPoolExecutor(max_workers=2)
+    raster_saves = save_png_tiff(rgba, OUTPUT_FILENAME, 900, encoder)
+    
+    # fig.savefig rather than plt.savefig: pyplot redraws the whole figure
+    # after every save, which nothing here displays
+    fig.savefig(f'{OUTPUT_FILENAME}.eps', format='eps', dpi=900, facecolor='white', 
                 edgecolor='white', bbox_inches='tight')
+    fig.savefig(f'{OUTPUT_FILENAME}.pdf', format='pdf', facecolor='white', 
+                edgecolor='white', bbox_inches='tight',
+                metadata={'CreationDate': None})
+    fig.savefig(f'{OUTPUT_FILENAME}.svg', format='svg', facecolor='white', 
+                edgecolor='white', bbox_inches='tight',
+                metadata={'Date': None})
+    
+    # Wait for the PNG/TIFF encodes, re-raising any error they hit
+    for save in raster_saves:
+        save.result()
+    encoder.shutdown()
+    del rgba
     
     # For EMF format
     try:
         import pyemf
-        plt.savefig(f'{OUTPUT_FILENAME}.emf', format='emf', facecolor='white', 
+        fig.savefig(f'{OUTPUT_FILENAME}.emf', format='emf', facecolor='white', 
                     edgecolor='white', bbox_inches='tight')
         print(f"Successfully generated: {OUTPUT_FILENAME}.png, .tiff, .eps, .pdf, .svg, .emf")
     except ImportError:
@@ -1,58 +1,70 @@
-import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
-from io import StringIO
+import os
 import sys
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+# raster_io.py (shared PNG/TIFF writer) lives one directory up
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from raster_io import render_rgba, save_png_tiff
+
+# Traces longer than this are strided before plotting: a subplot is only a
+# few thousand pixels wide even at 900 DPI, so further points add render and
+# file-size cost without visible detail
+MAX_PLOT_POINTS = 10000
 
 def load_xvg_data(filename):
     """
     Loads data from a GROMACS .xvg file.
     """
-    filtered_lines = []
+    # Reuse the parsed array cached next to the source as '<file>.npy' while
+    # it is newer than the .xvg
+    cache_file = filename + '.npy'
+    try:
+        if os.path.getmtime(cache_file) >= os.path.getmtime(filename):
+            return np.load(cache_file)
+    except (OSError, ValueError):
+        pass
+
     try:
-        with open(filename, 'r') as f:
-            for line in f:
-                # Skip header/comment/special lines
-                if not line.strip().startswith(('@', '#', '&')):
-                    filtered_lines.append(line)
+        # loadtxt drops the '@'/'#'/'&' lines and parses the two columns in C
+        with warnings.catch_warnings():
+            warnings.simplefilter(action='ignore', category=UserWarning)  # "input contained no data"
+            data = np.loadtxt(filename, comments=['@', '#', '&'], usecols=(0, 1),
+                              dtype=np.float64, ndmin=2)
     except FileNotFoundError:
         print(f"Warning: File not found: {filename}. Skipping this plot.", file=sys.stderr)
-        return pd.DataFrame(columns=['Time (ns)', 'RMSD (nm)'])
+        return np.empty((0, 2))
     except Exception as e:
-        print(f"Error reading {filename}: {e}", file=sys.stderr)
-        return pd.DataFrame(columns=['Time (ns)', 'RMSD (nm)'])
+        print(f"Error parsing data from {filename}: {e}", file=sys.stderr)
+        return np.empty((0, 2))
 
-    if not filtered_lines:
+    if not data.size:
         print(f"Warning: No data found in {filename} after filtering.", file=sys.stderr)
-        return pd.DataFrame(columns=['Time (ns)', 'RMSD (nm)'])
+        return data
 
     try:
-        data_io = StringIO("".join(filtered_lines))
-        with warnings.catch_warnings():
-            warnings.simplefilter(action='ignore', category=FutureWarning)
-            df = pd.read_csv(
-                data_io,
-                sep='\s+', 
-                header=None,
-                names=['Time (ns)', 'RMSD (nm)'],
-                dtype={'Time (ns)': float, 'RMSD (nm)': float},
-                engine='python'
-            )
-        return df
-    except Exception as e:
-        print(f"Error parsing data from {filename}: {e}", file=sys.stderr)
-        return pd.DataFrame(columns=['Time (ns)', 'RMSD (nm)'])
+        np.save(cache_file, data)
+    except OSError:
+        pass
+    return data
+
+def thin_trace(trace, max_points=MAX_PLOT_POINTS):
+    """Stride an (n, 2) trace down to about max_points rows for plotting"""
+    stride = max(1, len(trace) // max_points)
+    return trace[::stride]
 
 def plot_rmsd_on_ax(ax, backbone_file, title, backbone_color='blue'):
     """
     Plots ONLY backbone RMSD data on a given matplotlib axes object.
     """
-    # Load data
-    df_backbone = load_xvg_data(backbone_file)
+    # Load data, thinned before it reaches the renderer
+    backbone = thin_trace(load_xvg_data(backbone_file))
 
-    # Plot data if DataFrame is not empty
-    if not df_backbone.empty:
-        ax.plot(df_backbone['Time (ns)'], df_backbone['RMSD (nm)'], 
+    # Plot data if the array is not empty
+    if backbone.size:
+        ax.plot(backbone[:, 0], backbone[:, 1], 
                 label='Protein Backbone', color=backbone_color, linewidth=1.5)
     
     # Set subplot titles and labels
@@ -67,7 +79,7 @@ def plot_rmsd_on_ax(ax, backbone_file, title, backbone_color='blue'):
     ax.set_facecolor('white')
     
     # Add legend and grid
-    if not df_backbone.empty:
+    if backbone.size:
         ax.legend(facecolor='white', edgecolor='black', loc='upper right')
     ax.grid(True, linestyle='--', alpha=0.6, color='gray')
 
@@ -79,6 +91,10 @@ if __name__ == "__main__":
     plt.rcParams['axes.facecolor'] = 'white'
     plt.rcParams['savefig.facecolor'] = 'white'
     
+    # Reproducible PDF/SVG output: no creation dates (metadata below) and a
+    # fixed salt for the SVG element ids, so unchanged input saves identically
+    plt.rcParams['svg.hashsalt'] = 'rmsd'
+    
     # Create a 2x2 subplot grid
     fig, axes = plt.subplots(nrows=2, ncols=2, figsize=(16, 12))
 
@@ -119,30 +135,40 @@ if __name__ == "__main__":
     # --- SAVING IN ALL FORMATS ---
     OUTPUT_FILENAME = 'RMSD_Protein_Stability_Final'
     
-    # 1. PNG (High Res)
-    plt.savefig(f'{OUTPUT_FILENAME}.png', dpi=600, facecolor='white', 
-                edgecolor='white', bbox_inches='tight')
+    # 1./2. PNG and TIFF (High Res - Publication Standard): rasterize once at
+    # 600 DPI and encode both files from the same RGBA buffer
+    rgba = render_rgba(fig, 600, facecolor='white', edgecolor='white')
+    # Encode them on worker threads while the vector formats are written below
+    encoder = ThreadPoolExecutor(max_workers=2)
+    raster_saves = save_png_tiff(rgba, OUTPUT_FILENAME, 600, encoder)
     
-    # 2. TIFF (High Res - Publication Standard)
-    plt.savefig(f'{OUTPUT_FILENAME}.tiff', dpi=600, facecolor='white', 
-                edgecolor='white', bbox_inches='tight')
+    # fig.savefig rather than plt.savefig from here on: pyplot redraws the
+    # whole figure after every save, which nothing here displays
     
     # 3. EPS (Vector - Good for editing)
-    plt.savefig(f'{OUTPUT_FILENAME}.eps', format='eps', dpi=600, facecolor='white', 
+    fig.savefig(f'{OUTPUT_FILENAME}.eps', format='eps', dpi=600, facecolor='white', 
                 edgecolor='white', bbox_inches='tight')
     
     # 4. PDF (Vector - Standard)
-    plt.savefig(f'{OUTPUT_FILENAME}.pdf', format='pdf', facecolor='white', 
-                edgecolor='white', bbox_inches='tight')
+    fig.savefig(f'{OUTPUT_FILENAME}.pdf', format='pdf', facecolor='white', 
+                edgecolor='white', bbox_inches='tight',
+                metadata={'CreationDate': None})
     
     # 5. SVG (Vector - Web/Inkscape)
-    plt.savefig(f'{OUTPUT_FILENAME}.svg', format='svg', facecolor='white', 
-                edgecolor='white', bbox_inches='tight')
+    fig.savefig(f'{OUTPUT_FILENAME}.svg', format='svg', facecolor='white', 
+                edgecolor='white', bbox_inches='tight',
+                metadata={'Date': None})
+    
+    # Wait for the PNG/TIFF encodes, re-raising any error they hit
+    for save in raster_saves:
+        save.result()
+    encoder.shutdown()
+    del rgba
     
     # 6. EMF (Optional - Good for Word/PowerPoint)
     try:
         import pyemf
-        plt.savefig(f'{OUTPUT_FILENAME}.emf', format='emf', facecolor='white', 
+        fig.savefig(f'{OUTPUT_FILENAME}.emf', format='emf', facecolor='white', 
                     edgecolor='white', bbox_inches='tight')
         print(f"Successfully generated: {OUTPUT_FILENAME}.png, .tiff, .eps, .pdf, .svg, .emf")
     except ImportError:
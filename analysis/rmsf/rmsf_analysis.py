@@ -1,81 +1,88 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-from io import StringIO
+import numpy as np
+import os
 import sys
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 
-def load_xvg_data(filename, x_col="X-Axis", y_col="Y-Axis"):
+def load_xvg_data(filename):
     """
     Loads data from a GROMACS .xvg file.
     
     Skips lines starting with '@', '#', or '&'.
-    Returns a pandas DataFrame with specified column names.
-    Returns an empty DataFrame if the file is not found or is empty.
+    Returns an (n, 2) float array of the x and y columns.
+    Returns an empty (0, 2) array if the file is not found or is empty.
     """
-    filtered_lines = []
+    # Reuse the parsed array cached next to the source as '<file>.npy' while
+    # it is newer than the .xvg
+    cache_file = filename + '.npy'
     try:
-        with open(filename, 'r') as f:
-            for line in f:
-                # Skip header/comment/special lines
-                if not line.strip().startswith(('@', '#', '&')):
-                    filtered_lines.append(line)
+        if os.path.getmtime(cache_file) >= os.path.getmtime(filename):
+            return np.load(cache_file)
+    except (OSError, ValueError):
+        pass
+
+    try:
+        # loadtxt drops the '@'/'#'/'&' lines (including the legend lines
+        # after each '&' in multi-set files) and parses the two columns in C
+        with warnings.catch_warnings():
+            warnings.simplefilter(action='ignore', category=UserWarning)  # "input contained no data"
+            data = np.loadtxt(filename, comments=['@', '#', '&'], usecols=(0, 1),
+                              dtype=np.float64, ndmin=2)
     except FileNotFoundError:
         print(f"Warning: File not found: {filename}. Skipping this plot.", file=sys.stderr)
-        return pd.DataFrame(columns=[x_col, y_col])
+        return np.empty((0, 2))
     except Exception as e:
-        print(f"Error reading {filename}: {e}", file=sys.stderr)
-        return pd.DataFrame(columns=[x_col, y_col])
+        print(f"Error parsing data from {filename}: {e}", file=sys.stderr)
+        return np.empty((0, 2))
 
-    if not filtered_lines:
+    if not data.size:
         print(f"Warning: No data found in {filename} after filtering.", file=sys.stderr)
-        return pd.DataFrame(columns=[x_col, y_col])
+        return data
 
     try:
-        # Use StringIO to read the list of strings as if it were a file
-        data_io = StringIO("".join(filtered_lines))
-        
-        # Suppress the FutureWarning from pandas
-        with warnings.catch_warnings():
-            warnings.simplefilter(action='ignore', category=FutureWarning)
-            df = pd.read_csv(
-                data_io,
-                sep='\s+',  # Use sep='\s+' instead of delim_whitespace=True
-                header=None,
-                names=[x_col, y_col], # Use the provided column names
-                dtype={x_col: float, y_col: float},
-                engine='python' 
-            )
-        return df
-    except Exception as e:
-        print(f"Error parsing data from {filename}: {e}", file=sys.stderr)
-        return pd.DataFrame(columns=[x_col, y_col])
+        np.save(cache_file, data)
+    except OSError:
+        pass
+    return data
 
-def plot_analysis_on_ax(ax, data_file, title, x_label, y_label, plot_color, legend_label):
+def plot_analysis_on_ax(ax, data, title, x_label, y_label, plot_color, legend_label):
     """
     Plots a single analysis (like Rg, RMSF, or SASA) on a given matplotlib axes.
     """
-    # Load the data using our flexible function
-    df = load_xvg_data(data_file, x_col=x_label, y_col=y_label)
-
-    # Plot data if DataFrame is not empty
-    if not df.empty:
-        ax.plot(df[x_label], df[y_label], 
+    # Plot data if the array is not empty
+    if data.size:
+        ax.plot(data[:, 0], data[:, 1], 
                 label=legend_label, color=plot_color, linewidth=1.5)
     
     # Set subplot titles and labels
-    ax.set_title(title, fontsize=12, fontweight='bold')
+    ax.set_title(title)
     ax.set_xlabel(x_label)
     ax.set_ylabel(y_label)
     
-    # Add legend and grid
+    # Add legend (the dashed grid comes from rcParams)
     # --- THIS IS THE MODIFIED LINE ---
-    # Only show legend if the dataframe is not empty AND legend_label is not empty
-    if not df.empty and legend_label:
+    # Only show legend if the array is not empty AND legend_label is not empty
+    if data.size and legend_label:
         ax.legend()
-    ax.grid(True, linestyle='--', alpha=0.6)
 
 # --- MAIN PLOTTING LOGIC ---
 if __name__ == "__main__":
+    # pyplot is only needed to draw, so importing load_xvg_data from another
+    # module does not pay its start-up cost
+    import matplotlib.pyplot as plt
+
+    # Drop sub-pixel line vertices when rendering the per-residue profiles
+    plt.rcParams['path.simplify'] = True
+    plt.rcParams['path.simplify_threshold'] = 1.0
+
+    # Subplot title and grid style shared by every panel
+    plt.rcParams.update({
+        'axes.titlesize': 12,
+        'axes.titleweight': 'bold',
+        'axes.grid': True,
+        'grid.linestyle': '--',
+        'grid.alpha': 0.6,
+    })
     
     # --- 1. CONFIGURE YOUR ANALYSIS ---
     
@@ -92,45 +99,34 @@ if __name__ == "__main__":
     OUTPUT_FILENAME = 'RMSF_subplot_comparison.png'
 
     # --- 2. DEFINE YOUR FILES AND SUBPLOTS ---
-    # Create a 2x2 subplot grid
-    fig, axes = plt.subplots(nrows=2, ncols=2, figsize=(16, 12))
+    # (data file, subplot title, line color) for each panel, in 2x2 grid order
+    PANELS = [
+        ('control_rmsf_per_residue.xvg', 'A) Control Complex Complex', '#1e3a8a'),  # Dark Blue
+        ('hedragenin_rmsf_per_residue.xvg', 'B) Hedragenin Analogue Complex', '#15803d'),  # Dark Green
+        ('lupeol_rmsf_per_residue.xvg', 'C) Lupeol Analogue Complex', '#7c3aed'),  # Bright Purple
+        ('maslinic_acid_rmsf_per_residue.xvg', 'D) Maslinic Acid Analogue Complex', '#92400e'),  # Dark Brown
+    ]
 
-    # --- Plot 1 (Top-Left) ---
-    plot_analysis_on_ax(axes[0, 0], 
-                        data_file='control_rmsf_per_residue.xvg', 
-                        title='A) Control Complex Complex',
-                        x_label=X_AXIS_LABEL, y_label=Y_AXIS_LABEL,
-                        plot_color='#1e3a8a',  # Dark Blue
-                        legend_label=LEGEND_LABEL)
+    # Load the four profiles up front; the reads are independent, so a
+    # thread pool overlaps their file I/O
+    with ThreadPoolExecutor(max_workers=len(PANELS)) as executor:
+        profiles = list(executor.map(load_xvg_data, [data_file for data_file, _, _ in PANELS]))
 
-    # --- Plot 2 (Top-Right) ---
-    plot_analysis_on_ax(axes[0, 1], 
-                        data_file='hedragenin_rmsf_per_residue.xvg', 
-                        title='B) Hedragenin Analogue Complex',
-                        x_label=X_AXIS_LABEL, y_label=Y_AXIS_LABEL,
-                        plot_color='#15803d',  # Dark Green
-                        legend_label=LEGEND_LABEL)
-
-    # --- Plot 3 (Bottom-Left) ---
-    plot_analysis_on_ax(axes[1, 0], 
-                        data_file='lupeol_rmsf_per_residue.xvg', 
-                        title='C) Lupeol Analogue Complex',
-                        x_label=X_AXIS_LABEL, y_label=Y_AXIS_LABEL,
-                        plot_color='#7c3aed',  # Bright Purple
-                        legend_label=LEGEND_LABEL)
+    # Create a 2x2 subplot grid
+    fig, axes = plt.subplots(nrows=2, ncols=2, figsize=(16, 12))
 
-    # --- Plot 4 (Bottom-Right) ---
-    plot_analysis_on_ax(axes[1, 1], 
-                        data_file='maslinic_acid_rmsf_per_residue.xvg', 
-                        title='D) Maslinic Acid Analogue Complex',
-                        x_label=X_AXIS_LABEL, y_label=Y_AXIS_LABEL,
-                        plot_color='#92400e',  # Dark Brown
-                        legend_label=LEGEND_LABEL)
+    for ax, data, (_, title, plot_color) in zip(axes.flat, profiles, PANELS):
+        plot_analysis_on_ax(ax, data,
+                            title=title,
+                            x_label=X_AXIS_LABEL, y_label=Y_AXIS_LABEL,
+                            plot_color=plot_color,
+                            legend_label=LEGEND_LABEL)
 
     # --- 3. SAVE THE FIGURE ---
     fig.suptitle(MAIN_TITLE, fontsize=18, fontweight='bold')
     fig.tight_layout(rect=[0, 0.03, 1, 0.96]) 
-    plt.savefig(OUTPUT_FILENAME, dpi=300)
+    plt.savefig(OUTPUT_FILENAME, dpi=300,
+                pil_kwargs={'compress_level': 1})  # fast zlib, larger file
 # Save the final figure as EPS
     output_filename = 'rg_subplot_comparison.eps'
     plt.savefig(output_filename, format='eps')